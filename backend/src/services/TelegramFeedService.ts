@@ -78,7 +78,8 @@ export class TelegramFeedService {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           url: channelUrl,
-          limit: 10  // Get more posts for better feed
+          limit: 10,  // Get more posts for better feed
+          stream: false  // Synchronous response; we only need status + channel_id
         })
       });
 
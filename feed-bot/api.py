@@ -1,20 +1,68 @@
 import asyncio
 import importlib.util
+import json
+import logging
+import logging.handlers
 import os
+import queue
 import sys
+import uuid
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
+try:
+    import uvloop
+
+    uvloop.install()
+except ImportError:
+    # uvloop is unavailable on Windows; the default asyncio loop still works.
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class _HealthCheckFilter(logging.Filter):
+    """Drop uvicorn access-log lines for health-check polling of GET /."""
+
+    def filter(self, record):
+        return '"GET / ' not in record.getMessage()
+
+
+def _setup_logging():
+    """Route records through a queue so stdout I/O happens off the event loop.
+
+    print() holds the GIL for a synchronous, line-buffered write; under load
+    that serializes the async handlers. The QueueListener does the actual
+    writing on its own thread.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+
+    logging.getLogger("uvicorn.access").addFilter(_HealthCheckFilter())
+    return listener
+
+
+_log_listener = _setup_logging()
+
 # Import the scraper module (handling the hyphen in filename)
 try:
     file_path = os.path.join(os.path.dirname(__file__), "telegram-scraper.py")
@@ -24,13 +72,57 @@ try:
     spec.loader.exec_module(telegram_scraper_module)
     OptimizedTelegramScraper = telegram_scraper_module.OptimizedTelegramScraper
 except Exception as e:
-    print(f"Error importing scraper: {e}")
+    logger.error(f"Error importing scraper: {e}")
     sys.exit(1)
 
 
 # Global scraper instance
 scraper_instance = None
 
+# In-flight scrape jobs: job_id -> {"queue": asyncio.Queue, "consumed": bool}
+scrape_jobs = {}
+
+# A job whose stream is never opened would otherwise keep its queue of
+# buffered events alive forever; unconsumed jobs are dropped this long
+# after the scrape finishes
+SCRAPE_JOB_TTL_SECONDS = 60.0
+
+
+def _expire_scrape_job(job_id):
+    job = scrape_jobs.get(job_id)
+    if job is not None and not job["consumed"]:
+        del scrape_jobs[job_id]
+        logger.info(f"Dropped unconsumed scrape job {job_id}")
+
+
+def _scan_channel_photos():
+    """Walk channels/*/profile.jpg and build channel_id -> static URL."""
+    return {
+        photo_path.parent.name: f"/static/{str(photo_path).replace(os.sep, '/')}"
+        for photo_path in Path("channels").glob("*/profile.jpg")
+    }
+
+
+async def refresh_auth_state(interval_seconds: int = 60):
+    """Background task keeping the cached authorization flag fresh.
+
+    Handlers read `scraper_instance._authorized` instead of awaiting
+    `is_user_authorized()` (an MTProto roundtrip) on every request.
+    """
+    while True:
+        try:
+            await asyncio.sleep(interval_seconds)
+            if scraper_instance and scraper_instance.client:
+                scraper_instance._authorized = (
+                    await scraper_instance.client.is_user_authorized()
+                )
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.warning(f"Error refreshing auth state: {e}")
+            if scraper_instance:
+                scraper_instance._authorized = False
+
 
 async def run_periodic_checks(interval_seconds: int = 600):
     """Background task to scrape channels periodically"""
@@ -40,27 +132,44 @@ async def run_periodic_checks(interval_seconds: int = 600):
             if (
                 scraper_instance
                 and scraper_instance.client
-                and await scraper_instance.client.is_user_authorized()
+                and scraper_instance._authorized
             ):
-                print(
+                logger.info(
                     f"Starting automatic background scrape (Every {interval_seconds}s)..."
                 )
                 if scraper_instance.state.get("channels"):
-                    for channel_id in list(scraper_instance.state["channels"].keys()):
-                        try:
-                            print(f"   Checking channel: {channel_id}")
-                            await scraper_instance.scrape_channel(
-                                channel_id, 0, force_rescrape=True
-                            )
-                        except Exception as c_e:
-                            print(f"   Error auto-scraping {channel_id}: {c_e}")
-                    print("Automatic background scrape finished.")
+                    # Scrape channels concurrently; the semaphore keeps us
+                    # from hammering Telegram rate limits.
+                    semaphore = asyncio.Semaphore(5)
+
+                    async def _scrape_with_sem(channel_id):
+                        async with semaphore:
+                            try:
+                                logger.info(f"   Checking channel: {channel_id}")
+                                await scraper_instance.scrape_channel(
+                                    channel_id, 0, force_rescrape=True
+                                )
+                            except Exception as c_e:
+                                logger.warning(f"   Error auto-scraping {channel_id}: {c_e}")
+
+                    # Tuple snapshot: safe against concurrent modification
+                    # without the list allocation churn each cycle
+                    tasks = [
+                        asyncio.create_task(_scrape_with_sem(channel_id))
+                        for channel_id in tuple(scraper_instance.state["channels"])
+                    ]
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    # Pick up any newly downloaded profile pictures
+                    app.state.channel_photos = await asyncio.to_thread(
+                        _scan_channel_photos
+                    )
+                    logger.info("Automatic background scrape finished.")
                 else:
-                    print("   No channels to scrape.")
+                    logger.info("   No channels to scrape.")
         except asyncio.CancelledError:
             break
         except Exception as e:
-            print(f"Error in periodic scrape loop: {e}")
+            logger.warning(f"Error in periodic scrape loop: {e}")
             await asyncio.sleep(60)
 
 
@@ -71,31 +180,44 @@ async def lifespan(app: FastAPI):
     Initializes the Telegram client in headless mode.
     """
     global scraper_instance
-    print("Initializing Telegram Scraper API...")
+    logger.info("Initializing Telegram Scraper API...")
+
+    # Eager task factory (Python 3.12+) runs coroutines synchronously until
+    # their first suspension, skipping a trip through the ready queue for
+    # tasks that complete immediately.
+    loop = asyncio.get_running_loop()
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
 
     scraper_instance = OptimizedTelegramScraper()
 
     # Initialize in headless mode (uses ENV vars or saved session)
     # Ensure you have logged in at least once interactively to generate the session file!
     success = await scraper_instance.initialize_client(headless=True)
+    scraper_instance._authorized = success
 
     if success:
-        print("Telegram Client connected and authorized!")
+        logger.info("Telegram Client connected and authorized!")
     else:
-        print("Failed to connect Telegram Client. Check credentials or session.")
+        logger.warning("Failed to connect Telegram Client. Check credentials or session.")
+
+    # Index channel profile pictures once so /channel-photo never stats disk
+    app.state.channel_photos = await asyncio.to_thread(_scan_channel_photos)
 
-    # Start the background task
+    # Start the background tasks
     bg_task = asyncio.create_task(run_periodic_checks())
+    auth_task = asyncio.create_task(refresh_auth_state())
 
     yield
 
     # Shutdown logic
-    print("Shutting down Telegram Scraper API...")
-    bg_task.cancel()
-    try:
-        await bg_task
-    except asyncio.CancelledError:
-        pass
+    logger.info("Shutting down Telegram Scraper API...")
+    for task in (bg_task, auth_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
     if scraper_instance:
         scraper_instance.close_db_connections()
@@ -103,7 +225,13 @@ async def lifespan(app: FastAPI):
             await scraper_instance.client.disconnect()
 
 
-app = FastAPI(title="Telegram Feed Scraper API", lifespan=lifespan)
+# orjson serializes the potentially long message lists far faster than the
+# stdlib encoder
+app = FastAPI(
+    title="Telegram Feed Scraper API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -113,13 +241,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/static", StaticFiles(directory="."), name="static")
+@app.middleware("http")
+async def add_static_cache_headers(request, call_next):
+    """Let browsers cache media instead of re-fetching on every UI refresh.
+
+    Scraped media filenames embed the message id and never change, so they
+    get a long immutable lifetime; profile.jpg can be replaced in place, so
+    it only gets a short one (StaticFiles already emits ETag/Last-Modified
+    for revalidation).
+    """
+    response = await call_next(request)
+    path = request.url.path
+    if path.startswith("/static/channels/"):
+        if path.endswith("profile.jpg"):
+            response.headers.setdefault("Cache-Control", "public, max-age=300")
+        else:
+            response.headers.setdefault(
+                "Cache-Control", "public, max-age=86400, immutable"
+            )
+    return response
+
+
+# Serve only the channels tree (media + profile photos) rather than the
+# whole project root; URLs keep the /static/channels/... shape. aiofiles
+# lets Starlette stream files without blocking the loop.
+app.mount(
+    "/static/channels",
+    StaticFiles(directory="channels", check_dir=False),
+    name="static",
+)
+
+
+# The working directory never changes after startup, so compute the prefix
+# once instead of calling getcwd per request
+_CWD_PREFIX = os.getcwd().rstrip(os.sep) + os.sep
+
+
+def _media_url(media_path):
+    """Build the /static URL for a local media path with pure string work
+    (no per-message relpath/getcwd syscalls)."""
+    if not media_path:
+        return None
+    if media_path.startswith(_CWD_PREFIX):
+        rel_path = media_path.removeprefix(_CWD_PREFIX)
+    elif os.path.isabs(media_path):
+        # Unexpected location; fall back to the slow-but-correct path
+        rel_path = os.path.relpath(media_path, _CWD_PREFIX)
+    else:
+        rel_path = media_path
+    return "/static/" + rel_path.replace("\\", "/")
 
 
 class ScrapeRequest(BaseModel):
     url: str
     limit: int = 5  # Default to scraping 5 newest messages
     lang: str = None  # Target language for translation
+    stream: bool = True  # False: block and return results in the response
 
 
 @app.get("/")
@@ -129,7 +306,7 @@ async def health_check():
         "connected"
         if scraper_instance
         and scraper_instance.client
-        and await scraper_instance.client.is_user_authorized()
+        and scraper_instance._authorized
         else "disconnected"
     )
     return {
@@ -141,9 +318,9 @@ async def health_check():
     }
 
 
-@app.get("/feed", response_class=HTMLResponse)
-async def feed_ui():
-    return """
+# Encoded once at import so each GET /feed skips the per-request
+# str -> UTF-8 re-encode and HTMLResponse construction cost.
+_FEED_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -189,6 +366,79 @@ async def feed_ui():
 
         <script src="https://vjs.zencdn.net/8.23.4/video.min.js"></script>
         <script>
+            const VIDEO_EXTS = new Set(['mp4', 'webm', 'mov', 'avi', 'mkv']);
+            const EXT_RE = /\\.([^./?#]+)(?:[?#]|$)/;
+
+            function buildPost(msg) {
+                const post = document.createElement('div');
+                post.className = 'post';
+
+                let mediaHtml = '';
+                let videoId = null;
+
+                if (msg.media_url) {
+                    const ext = (EXT_RE.exec(msg.media_url)?.[1] || '').toLowerCase();
+                    if (VIDEO_EXTS.has(ext)) {
+                        videoId = 'vid-' + msg.message_id;
+                        let mimeType = 'video/mp4';
+                        if (ext === 'webm') mimeType = 'video/webm';
+
+                        mediaHtml = `
+                            <video
+                                id="${videoId}"
+                                class="video-js vjs-big-play-centered"
+                                controls
+                                preload="metadata"
+                                data-setup="{}"
+                            >
+                                <source src="${msg.media_url}" type="${mimeType}" />
+                            </video>`;
+                    } else {
+                        mediaHtml = `<img src="${msg.media_url}" loading="lazy" onclick="window.open(this.src, '_blank')">`;
+                    }
+                }
+
+                post.innerHTML = `
+                    <div class="meta">
+                        <span>${msg.date}</span>
+                        <span>👁️ ${msg.views || 0}</span>
+                    </div>
+                    <div class="content">${msg.message || ''}</div>
+                    ${mediaHtml}
+                `;
+                return { post, videoId };
+            }
+
+            // Streamed posts are buffered and flushed once per animation
+            // frame through a DocumentFragment, so N posts cost one reflow.
+            let pendingPosts = [];
+            let flushScheduled = false;
+
+            function flushPosts() {
+                flushScheduled = false;
+                const feed = document.getElementById('feed');
+                const fragment = document.createDocumentFragment();
+                const videoIds = [];
+
+                for (const msg of pendingPosts) {
+                    const { post, videoId } = buildPost(msg);
+                    fragment.appendChild(post);
+                    if (videoId) videoIds.push(videoId);
+                }
+                pendingPosts = [];
+
+                feed.appendChild(fragment);
+                videoIds.forEach(id => videojs(id));
+            }
+
+            function renderPost(msg) {
+                pendingPosts.push(msg);
+                if (!flushScheduled) {
+                    flushScheduled = true;
+                    requestAnimationFrame(flushPosts);
+                }
+            }
+
             async function scrape() {
                 const url = document.getElementById('url').value;
                 const limit = document.getElementById('limit').value;
@@ -203,6 +453,11 @@ async def feed_ui():
                 loading.style.display = 'block';
                 feed.innerHTML = '';
 
+                const finish = () => {
+                    btn.disabled = false;
+                    loading.style.display = 'none';
+                };
+
                 try {
                     const response = await fetch('/scrape', {
                         method: 'POST',
@@ -212,140 +467,190 @@ async def feed_ui():
 
                     const data = await response.json();
 
-                    if (data.status === 'success') {
-                        data.messages.forEach(msg => {
-                            const post = document.createElement('div');
-                            post.className = 'post';
-
-                            let mediaHtml = '';
-                            let isVideo = false;
-                            const videoId = 'vid-' + msg.message_id;
-
-                            if (msg.media_url) {
-                                const ext = msg.media_url.split('.').pop().toLowerCase();
-                                if (['mp4', 'webm', 'mov', 'avi', 'mkv'].includes(ext)) {
-                                    isVideo = true;
-                                    let mimeType = 'video/mp4';
-                                    if (ext === 'webm') mimeType = 'video/webm';
-
-                                    mediaHtml = `
-                                        <video
-                                            id="${videoId}"
-                                            class="video-js vjs-big-play-centered"
-                                            controls
-                                            preload="metadata"
-                                            data-setup="{}"
-                                        >
-                                            <source src="${msg.media_url}" type="${mimeType}" />
-                                        </video>`;
-                                } else {
-                                    mediaHtml = `<img src="${msg.media_url}" loading="lazy" onclick="window.open(this.src, '_blank')">`;
-                                }
-                            }
-
-                            post.innerHTML = `
-                                <div class="meta">
-                                    <span>${msg.date}</span>
-                                    <span>👁️ ${msg.views || 0}</span>
-                                </div>
-                                <div class="content">${msg.message || ''}</div>
-                                ${mediaHtml}
-                            `;
-                            feed.appendChild(post);
-
-                            if (isVideo) {
-                                videojs(videoId);
-                            }
-                        });
-                        if (data.messages.length === 0) {
-                            feed.innerHTML = '<div class="post" style="text-align:center">No messages found</div>';
-                        }
-                    } else {
+                    if (data.status !== 'accepted') {
                         alert('Error: ' + (data.detail || 'Unknown error'));
+                        finish();
+                        return;
                     }
+
+                    // Posts stream in via SSE as the scrape progresses
+                    let received = 0;
+                    const es = new EventSource(data.stream_url);
+
+                    es.onmessage = (e) => {
+                        renderPost(JSON.parse(e.data));
+                        received++;
+                    };
+
+                    es.addEventListener('done', () => {
+                        if (received === 0) {
+                            feed.innerHTML = '<div class="post" style="text-align:center">No messages found</div>';
+                        }
+                        es.close();
+                        finish();
+                    });
+
+                    es.addEventListener('error', (e) => {
+                        if (e.data) {
+                            alert('Error: ' + (JSON.parse(e.data).detail || 'Unknown error'));
+                        }
+                        es.close();
+                        finish();
+                    });
                 } catch (e) {
                     alert('Error: ' + e.message);
-                } finally {
-                    btn.disabled = false;
-                    loading.style.display = 'none';
+                    finish();
                 }
             }
         </script>
     </body>
     </html>
     """
+_FEED_HTML_BYTES = _FEED_HTML.encode("utf-8")
+
+
+@app.get("/feed")
+async def feed_ui():
+    return Response(content=_FEED_HTML_BYTES, media_type="text/html")
+
+
+async def run_scrape(job_id: str, request: ScrapeRequest):
+    """Execute a scrape job and push results onto its event queue."""
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        # The client opened and dropped the stream before this task started;
+        # the generator's cleanup already removed the job, so there is
+        # nobody left to consume the results
+        logger.info(f"Scrape job {job_id} abandoned before start; skipping")
+        return
+    job_queue = job["queue"]
+    try:
+        # The limit is passed per call rather than written to shared state,
+        # so concurrent jobs with different limits don't race each other
+        result = await scraper_instance.scrape_channel_by_url(
+            request.url, target_lang=request.lang, limit=request.limit
+        )
+
+        if result.get("status") == "error":
+            await job_queue.put(
+                {"event": "error", "data": {"detail": result.get("message")}}
+            )
+            return
+
+        raw_messages = result.get("messages", [])
+
+        # Iterate in reverse so newest appear at the bottom, without
+        # allocating a reversed copy of the list
+        for msg in reversed(raw_messages):
+            await job_queue.put(
+                {
+                    "event": "message",
+                    "data": {
+                        "message_id": msg.message_id,
+                        "date": msg.date,
+                        "message": msg.message,
+                        "views": msg.views,
+                        "media_url": _media_url(msg.media_path),
+                    },
+                }
+            )
+
+        await job_queue.put(
+            {"event": "done", "data": {"channel_id": result.get("channel_id")}}
+        )
+
+    except Exception as e:
+        logger.warning(f"Error in scrape job {job_id}: {e}")
+        await job_queue.put({"event": "error", "data": {"detail": str(e)}})
+    finally:
+        asyncio.get_running_loop().call_later(
+            SCRAPE_JOB_TTL_SECONDS, _expire_scrape_job, job_id
+        )
 
 
 @app.post("/scrape")
 async def scrape_channel(request: ScrapeRequest, background_tasks: BackgroundTasks):
     """
-    Scrape a specific channel by URL.
-    This triggers the scraper to fetch messages and upload to Supabase.
+    Start a scrape job for a channel URL.
+    Returns a job id immediately; results stream over /scrape/stream/{job_id}
+    so the event loop stays free during the (seconds-long) Telethon scrape.
     """
     if not scraper_instance or not scraper_instance.client:
         raise HTTPException(status_code=503, detail="Scraper not initialized")
 
-    if not await scraper_instance.client.is_user_authorized():
+    if not scraper_instance._authorized:
         raise HTTPException(
             status_code=401,
             detail="Bot not authorized. Please run interactively to login.",
         )
 
-    # Set the limit for this request if provided
-    if request.limit:
-        scraper_instance.state["message_limit"] = request.limit
-
-    print(f"Incoming request to scrape: {request.url}")
+    logger.info(f"Incoming request to scrape: {request.url}")
 
-    # We perform the scraping
-    # Note: Depending on response time requirements, this could be moved to background_tasks
-    # But user likely wants to know if it succeeded.
-
-    try:
-        result = await scraper_instance.scrape_channel_by_url(
-            request.url, target_lang=request.lang
-        )
+    if not request.stream:
+        # Synchronous compatibility path: non-streaming clients (the Node
+        # backend checks status/channel_id on the response body) get the
+        # pre-SSE response shape
+        try:
+            result = await scraper_instance.scrape_channel_by_url(
+                request.url, target_lang=request.lang, limit=request.limit
+            )
+        except Exception as e:
+            logger.warning(f"Error in /scrape endpoint: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
         if result.get("status") == "error":
             raise HTTPException(status_code=400, detail=result.get("message"))
 
-        # Process messages for frontend
         raw_messages = result.get("messages", [])
-        clean_messages = []
-
-        for msg in raw_messages:
-            msg_dict = {
+        clean_messages = [
+            {
                 "message_id": msg.message_id,
                 "date": msg.date,
                 "message": msg.message,
                 "views": msg.views,
-                "media_url": None,
+                "media_url": _media_url(msg.media_path),
             }
-
-            if msg.media_path:
-                try:
-                    # Convert absolute path to relative for static serving
-                    # Assumes app is running from project root
-                    rel_path = os.path.relpath(msg.media_path, os.getcwd())
-                    rel_path = rel_path.replace("\\", "/")
-                    msg_dict["media_url"] = f"/static/{rel_path}"
-                except Exception:
-                    pass
-
-            clean_messages.append(msg_dict)
-
-        # Reverse messages so newest appear at the bottom
-        clean_messages.reverse()
-
+            for msg in reversed(raw_messages)
+        ]
         return {
             "status": "success",
             "channel_id": result.get("channel_id"),
             "messages": clean_messages,
         }
 
-    except Exception as e:
-        print(f"Error in /scrape endpoint: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    job_id = uuid.uuid4().hex
+    scrape_jobs[job_id] = {"queue": asyncio.Queue(), "consumed": False}
+    background_tasks.add_task(run_scrape, job_id, request)
+
+    return {
+        "status": "accepted",
+        "job_id": job_id,
+        "stream_url": f"/scrape/stream/{job_id}",
+    }
+
+
+@app.get("/scrape/stream/{job_id}")
+async def scrape_stream(job_id: str):
+    """
+    Server-sent events stream for a scrape job started via /scrape.
+    """
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    job["consumed"] = True
+    job_queue = job["queue"]
+
+    async def event_stream():
+        try:
+            while True:
+                item = await job_queue.get()
+                yield f"event: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+                if item["event"] in ("done", "error"):
+                    break
+        finally:
+            scrape_jobs.pop(job_id, None)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.get("/posts")
@@ -358,28 +663,16 @@ async def get_posts(limit: int = 20):
 
     try:
         raw_messages = scraper_instance.get_recent_messages(limit=limit)
-        clean_messages = []
-
-        for msg in raw_messages:
-            msg_dict = msg.copy()
-            msg_dict["media_url"] = None
-
-            if msg.get("media_path"):
-                try:
-                    # Convert absolute path to relative for static serving
-                    # Assumes app is running from project root
-                    rel_path = os.path.relpath(msg["media_path"], os.getcwd())
-                    rel_path = rel_path.replace("\\", "/")
-                    msg_dict["media_url"] = f"/static/{rel_path}"
-                except Exception:
-                    pass
 
-            clean_messages.append(msg_dict)
+        clean_messages = [
+            {**msg, "media_url": _media_url(msg.get("media_path"))}
+            for msg in raw_messages
+        ]
 
         return {"status": "success", "messages": clean_messages}
 
     except Exception as e:
-        print(f"Error in /posts endpoint: {e}")
+        logger.warning(f"Error in /posts endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -387,31 +680,16 @@ async def get_posts(limit: int = 20):
 async def get_channel_photo(channel_id: str):
     """
     Get channel profile picture URL.
-    Returns the static URL if available, otherwise returns None.
+    Served from the in-memory index built at startup (and refreshed by the
+    periodic scrape loop) so no filesystem stat happens per request.
     """
-    try:
-        # Check if profile picture exists
-        channel_dir = Path("channels") / channel_id
-        photo_path = channel_dir / "profile.jpg"
-        
-        if photo_path.exists():
-            rel_path = os.path.relpath(str(photo_path), os.getcwd())
-            rel_path = rel_path.replace("\\", "/")
-            return {
-                "status": "success",
-                "photo_url": f"/static/{rel_path}"
-            }
-        else:
-            return {
-                "status": "not_found",
-                "photo_url": None
-            }
-    except Exception as e:
-        print(f"Error getting channel photo: {e}")
-        return {
-            "status": "error",
-            "photo_url": None
-        }
+    photo_url = app.state.channel_photos.get(channel_id)
+    if photo_url:
+        return ORJSONResponse(
+            {"status": "success", "photo_url": photo_url},
+            headers={"Cache-Control": "public, max-age=300"},
+        )
+    return {"status": "not_found", "photo_url": None}
 
 
 @app.post("/cleanup")
@@ -1,51 +1,161 @@
+import asyncio
+import logging
 import os
+import random
+from pathlib import Path
 
-from supabase import Client, create_client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+logger = logging.getLogger(__name__)
+
+# Generous keepalive pool so bulk upserts and media uploads reuse TCP+TLS
+# connections (and multiplex over HTTP/2) instead of re-handshaking.
+_HTTPX_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=50, keepalive_expiry=60
+)
+
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "gif": "image/gif",
+    "mp4": "video/mp4",
+    "webm": "video/webm",
+    "mov": "video/quicktime",
+}
+
+# Async clients are created per credential pair and shared process-wide;
+# acreate_client sets up an httpx client with its own TLS state, so we
+# should not pay that cost more than once.
+_clients: dict = {}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Only transient failures are worth another attempt.
+
+    Transport errors and throttling/server-side errors can succeed on
+    retry; schema mismatches and other 4xx payload errors will fail
+    identically every time, so they surface immediately instead of
+    burning backoff sleeps.
+    """
+    if isinstance(exc, httpx.TransportError):
+        return True
+    # Supabase API errors carry the HTTP status as status/status_code/code
+    # depending on the sub-client (storage vs PostgREST)
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(exc, "status", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return False
+    return status == 429 or 500 <= status < 600
+
+
+async def _with_retries(coro_factory, max_retries: int = 3):
+    """Await coro_factory() with jittered exponential backoff.
+
+    Transient network errors and PostgREST rate limiting otherwise drop
+    whole batches; jitter keeps concurrent retries from re-arriving in
+    lockstep. Permanent errors are re-raised on the first attempt.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await coro_factory()
+        except Exception as e:
+            if not _is_retryable(e):
+                raise
+            attempt += 1
+            if attempt >= max_retries:
+                raise
+            delay = min(30.0, 2**attempt) * (1 + random.random() * 0.5)
+            await asyncio.sleep(delay)
+
+
+async def _get_client(url: str, key: str) -> AsyncClient:
+    client = _clients.get((url, key))
+    if client is None:
+        client = _clients[(url, key)] = await acreate_client(
+            url,
+            key,
+            options=AsyncClientOptions(
+                httpx_client=httpx.AsyncClient(http2=True, limits=_HTTPX_LIMITS)
+            ),
+        )
+    return client
 
 
 class SupabaseManager:
     def __init__(self, url: str, key: str):
         if not url or not key:
             raise ValueError("Supabase URL and Key are required")
-        self.client: Client = create_client(url, key)
+        self._url = url
+        self._key = key
+        self.client: AsyncClient = None
+
+    async def _ensure_client(self) -> AsyncClient:
+        """Lazily create the async client on first use from async context."""
+        if self.client is None:
+            self.client = await _get_client(self._url, self._key)
+        return self.client
 
-    def upload_media(self, bucket: str, local_path: str, storage_path: str) -> str:
+    async def upload_media(self, bucket: str, local_path: str, storage_path: str) -> str:
         """
         Uploads a file to Supabase Storage and returns the public URL.
         """
         try:
+            client = await self._ensure_client()
+
             # Determine content type based on extension
-            ext = local_path.split(".")[-1].lower()
-            content_type = "image/jpeg"  # default
-            if ext == "png":
-                content_type = "image/png"
-            elif ext == "mp4":
-                content_type = "video/mp4"
-
-            with open(local_path, "rb") as f:
-                self.client.storage.from_(bucket).upload(
-                    file=f,
+            ext = Path(local_path).suffix.lstrip(".").lower()
+            content_type = CONTENT_TYPES.get(ext, "application/octet-stream")
+
+            # Read in a worker thread so large media doesn't block the loop
+            data = await asyncio.to_thread(Path(local_path).read_bytes)
+            await _with_retries(
+                lambda: client.storage.from_(bucket).upload(
+                    file=data,
                     path=storage_path,
                     file_options={"content-type": content_type, "upsert": "true"},
                 )
-            return self.client.storage.from_(bucket).get_public_url(storage_path)
+            )
+            return await client.storage.from_(bucket).get_public_url(storage_path)
         except Exception as e:
-            print(f"Supabase Upload Error: {e}")
+            logger.warning(f"Supabase Upload Error: {e}")
             return None
 
-    def save_message(self, table: str, data: dict):
+    async def save_message(self, table: str, data: dict):
         """
-        Saves a message record to the database.
+        Saves a single message record to the database.
         """
+        return await self.save_messages(table, [data])
+
+    async def save_messages(self, table: str, rows: list):
+        """
+        Bulk-upserts message records in one request per chunk instead of
+        one HTTP roundtrip per row. Chunked to stay under PostgREST
+        payload limits.
+        """
+        CHUNK_SIZE = 500
+        result = None
         try:
-            # Use upsert to avoid duplicates based on message_id if configured in Supabase
-            return (
-                self.client.table(table)
-                .upsert(data, on_conflict="message_id")
-                .execute()
-            )
+            client = await self._ensure_client()
+            for i in range(0, len(rows), CHUNK_SIZE):
+                chunk = rows[i : i + CHUNK_SIZE]
+                # Use upsert to avoid duplicates based on message_id if configured in Supabase
+                result = await _with_retries(
+                    lambda: client.table(table)
+                    .upsert(chunk, on_conflict="message_id")
+                    .execute()
+                )
+            return result
         except Exception as e:
-            print(f"Supabase Insert Error: {e}")
+            logger.warning(f"Supabase Insert Error: {e}")
             return None
 
     def cleanup_old_messages(self, table: str, days: int = 3):
@@ -1,19 +1,25 @@
 import asyncio
+import atexit
 import csv
+import functools
 import json
+import logging
 import os
+import random
+import re
 import sqlite3
 import sys
+import threading
 import time
 import uuid
 import warnings
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass
 from io import StringIO
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import qrcode
-from telethon import TelegramClient
+from telethon import TelegramClient, functions
 from telethon.errors import FloodWaitError, SessionPasswordNeededError
 from telethon.tl.types import (
     Channel,
@@ -32,16 +38,31 @@ except ImportError:
     SupabaseManager = None
 
 try:
-    from openai import AsyncOpenAI
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Side effect only: input() gains line editing, and the history we load
+    # below lets arrow keys recall previous channel IDs and menu choices
+    import readline
+except ImportError:  # Windows ships without readline
+    readline = None
+
+try:
+    from openai import AsyncOpenAI, RateLimitError
 except ImportError:
     print("\n[WARNING]: 'openai' library not installed. AI translation will NOT work.")
     print("Run this command to fix it: .venv\\Scripts\\pip install openai\n")
     AsyncOpenAI = None
+    RateLimitError = None
 
 warnings.filterwarnings(
     "ignore", message="Using async sessions support is an experimental feature"
 )
 
+logger = logging.getLogger("scraper")
+
 
 def display_ascii_art():
     WHITE = "\033[97m"
@@ -79,7 +100,172 @@ def extract_button_urls(message) -> str:
     return ""
 
 
-@dataclass
+INSERT_MESSAGES_SQL = """INSERT OR IGNORE INTO messages
+               (message_id, date, sender_id, first_name, last_name, username,
+                message, media_type, media_path, reply_to, post_author, views,
+                forwards, reactions)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+UPDATE_MEDIA_PATH_SQL = "UPDATE messages SET media_path = ? WHERE message_id = ?"
+
+# SQLite's compiled-in default for SQLITE_MAX_ATTACHED; the 11th ATTACH on a
+# connection fails with "too many attached databases" and setlimit() cannot
+# raise the cap, so cross-channel queries go in groups of this size
+_MAX_ATTACHED_DBS = 10
+
+# Exports only carry the columns the feed consumers actually read; pruning
+# the rest keeps the scan to fewer SQLite page bytes and smaller files
+EXPORT_COLUMNS = ("message_id", "date", "message", "views", "media_path", "media_type")
+EXPORT_QUERY = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM messages ORDER BY date"
+
+# Parses "[<id>] <translation>" items out of a batched translation response;
+# translations may span multiple lines, so each item runs until the next ID
+_TRANSLATION_ITEM_RE = re.compile(r"^\[(\d+)\][ \t]*(.*?)(?=^\[\d+\]|\Z)", re.M | re.S)
+
+# Sentinel distinguishing "channel absent" from a stored offset of 0, so
+# duplicate checks in the add loops cost one dict probe instead of two
+_MISSING = object()
+
+# Pre-bound formatters for the bulk "add all" listing: binding .format once
+# skips the per-line attribute lookup and f-string setup when emitting
+# hundreds of result lines in one pass
+_ADD_LINE = "✅ Added channel {} (ID: {})".format
+_DUP_LINE = "Channel {} already added".format
+
+# All 31 renderings of the 30-cell progress bar, precomputed so drawing is an
+# index instead of two string multiplications per update
+_BAR_CACHE = ["█" * i + "░" * (30 - i) for i in range(31)]
+
+
+# Prompt history persists next to state.json so channel IDs typed in a
+# previous run are one arrow-key away instead of re-typed
+_HISTORY_FILE = ".wave_history"
+
+
+def _setup_input_history():
+    if readline is None:
+        return
+    try:
+        readline.read_history_file(_HISTORY_FILE)
+    except OSError:
+        pass
+    readline.set_history_length(500)
+    atexit.register(_save_input_history)
+
+
+def _save_input_history():
+    try:
+        readline.write_history_file(_HISTORY_FILE)
+    except OSError:
+        pass
+
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line of input on a worker thread.
+
+    A bare input() blocks the whole event loop, stalling Telethon's
+    keepalive and any background scrape while the user thinks.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+
+
+async def _retry(
+    coro_factory,
+    retry_on=(Exception,),
+    max_retries: int = 3,
+    base: float = 1.0,
+    cap: float = 30.0,
+    jitter: float = 0.5,
+):
+    """Await coro_factory() with exponential backoff and jitter on failure.
+
+    The jitter spreads retries out so a burst of rate-limited calls does
+    not hammer the service again in lockstep.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await coro_factory()
+        except retry_on:
+            attempt += 1
+            if attempt >= max_retries:
+                raise
+            delay = min(cap, base * 2**attempt) * (1 + random.random() * jitter)
+            await asyncio.sleep(delay)
+
+
+def _photo_meta(message):
+    return getattr(message.file, "name", None) or "photo.jpg", "jpg"
+
+
+def _document_meta(message):
+    ext = getattr(message.file, "ext", "bin") if message.file else "bin"
+    return getattr(message.file, "name", None) or f"document.{ext}", ext
+
+
+# Exact-type dispatch for downloadable media: one dict probe instead of an
+# isinstance chain per call. Anything absent (webpage previews, polls, ...)
+# has no file to download.
+_MEDIA_META_HANDLERS = {
+    MessageMediaPhoto: _photo_meta,
+    MessageMediaDocument: _document_meta,
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_channel_selection(selection: str, channel_ids: tuple):
+    """Parse a channel selection string against the given channel ids.
+
+    Pure so it can be memoized: users re-run maintenance commands with
+    the same selection, and the channel-ids tuple in the key invalidates
+    entries whenever the channel set changes. Returns (selected, errors)
+    as tuples.
+    """
+    if selection.lower() == "all":
+        return channel_ids, ()
+
+    known = set(channel_ids)
+    selected = []
+    errors = []
+    for token in [x.strip() for x in selection.split(",")]:
+        try:
+            if token.startswith("-"):
+                if token in known:
+                    selected.append(token)
+                else:
+                    errors.append(f"Channel ID {token} not found in your channels")
+            else:
+                num = int(token)
+                if 1 <= num <= len(channel_ids):
+                    selected.append(channel_ids[num - 1])
+                else:
+                    errors.append(
+                        f"Invalid channel number: {num}. Valid range: 1-{len(channel_ids)}"
+                    )
+        except ValueError:
+            errors.append(
+                f"Invalid input: {token}. Use numbers (1,2,3) or full IDs (-100123...)"
+            )
+
+    return tuple(selected), tuple(errors)
+
+
+def _fmt_dt(d) -> str:
+    """Format a datetime as "YYYY-MM-DD HH:MM:SS".
+
+    Equivalent to strftime("%Y-%m-%d %H:%M:%S") but several times faster,
+    which matters when it runs once per scraped message on the loop thread.
+    """
+    return (
+        f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+        f" {d.hour:02d}:{d.minute:02d}:{d.second:02d}"
+    )
+
+
+# slots=True drops the per-instance __dict__ (~240 B/message saved while a
+# scrape buffers rows) and speeds up attribute access; instances stay mutable
+# because translation and the media phase write back into them
+@dataclass(slots=True)
 class MessageData:
     message_id: int
     date: str
@@ -102,17 +288,81 @@ class OptimizedTelegramScraper:
         self.STATE_FILE = "state.json"
         self.state = self.load_state()
         self.client = None
+        self._authorized = False
         self.continuous_scraping_active = False
         self.max_concurrent_downloads = 5
+        # Per-category caps matching Telegram's own download queues; refined
+        # from AppConfig after login
+        self.max_concurrent_downloads_small = 10
+        self.max_concurrent_downloads_large = 4
+        self.max_concurrent_translations = 16
+        # Messages folded into one translation prompt; amortizes the
+        # per-call LLM round-trip across the group
+        self.translation_batch_size = 20
         self.batch_size = 100
-        self.state_save_interval = 50
+        self.insert_flush_threshold = 1000
         self.db_connections = {}
+        # Rows buffered per channel until the next explicit transaction
+        self._pending_rows = {}
+        # Supabase media-URL records buffered per channel for bulk upsert
+        self._pending_media_urls = {}
+        self.media_url_flush_threshold = 100
+        self._last_progress_ts = 0.0
+        self._stdout_isatty = sys.stdout.isatty()
+        self._last_state_bytes = None
+        # While a continuous poll cycle runs, per-channel saves are deferred
+        # and folded into one write at the end of the cycle
+        self._defer_state_saves = False
+        self._state_dirty = False
+        # Debounce bookkeeping: bursts of saves (adding many channels at
+        # once) collapse into one write per second plus a trailing flush
+        self._state_flush_handle = None
+        self._last_state_write_ts = 0.0
+        # Serializes executor-thread state writes; overlap is rare under the
+        # debounce but an interleaved temp-write/rename would corrupt nothing
+        # yet could land an older payload last
+        self._state_write_lock = threading.Lock()
+        # Cached dialog listing: iter_dialogs pages through the whole
+        # account, so re-entering the list menu inside the TTL reuses the
+        # last fetch instead of repeating the round trips
+        self._dialogs_cache = (0.0, None)
+        self.dialogs_cache_ttl = 300.0
+        # (channels-items key, rendered text) for view_channels; keyed on the
+        # offsets so any scrape or add/remove naturally invalidates it
+        self._view_cache = (None, None)
+        # Entity-id -> state key, so repeated API scrapes of the same URL
+        # skip the -100 normalization string work
+        self._channel_key_by_entity_id = {}
+        # Single-writer pipeline: SQLite writes are queued and applied on a
+        # worker thread so commits never stall the event loop
+        self._write_queue = None
+        self._write_task = None
+        # Channels whose media folder is known to exist (skip repeat mkdirs)
+        self._media_dirs = set()
+        # Resolved Telethon entities, reused across continuous-scraping
+        # cycles; get_entity is cached upstream but still does a session-DB
+        # lookup per call
+        self._entity_cache = {}
+        # Read-side connection with every channel DB attached, so the feed
+        # query is one UNION ALL statement instead of one query per channel
+        self._feed_conn = None
+        self._feed_attached = {}
+        self._feed_query_cache = {}
+        # Open fds for per-channel .offset sidecars (8-byte checkpoint files
+        # written by the DB writer instead of rewriting state.json)
+        self._offset_fds = {}
+        # Channels whose incremental scrape wants the sidecar checkpointed;
+        # limited rescrapes stay out so they never move the resume point
+        self._offset_tracked = set()
+        # Channels with a failed insert flush this scrape; their offset must
+        # not advance, or the dropped rows are skipped forever
+        self._insert_failures = set()
 
         # Initialize AI
         self.ai_client = None
         ai_key = os.getenv("AI_API_KEY")
-        print(
-            f"DEBUG: AI Init - Key present: {bool(ai_key)}, AsyncOpenAI: {AsyncOpenAI}"
+        logger.debug(
+            "AI init - key present: %s, AsyncOpenAI: %s", bool(ai_key), AsyncOpenAI
         )
 
         if not AsyncOpenAI:
@@ -149,44 +399,179 @@ class OptimizedTelegramScraper:
             except Exception as e:
                 print(f"[ERROR] Failed to initialize Supabase: {e}")
 
+    async def _configure_download_limits(self):
+        """Size download concurrency from Telegram's advertised queue limits.
+
+        AppConfig exposes how many parallel operations the small (photos)
+        and large (documents/video) download queues tolerate before
+        FloodWaits kick in; a hardcoded 5 under-uses the link.
+        """
+        try:
+            app_config = await self.client(functions.help.GetAppConfigRequest(hash=0))
+            values = {
+                item.key: getattr(item.value, "value", None)
+                for item in app_config.config.value
+            }
+            small = values.get("small_queue_max_active_operations_count")
+            large = values.get("large_queue_max_active_operations_count")
+            if small:
+                self.max_concurrent_downloads_small = int(small)
+            if large:
+                self.max_concurrent_downloads_large = int(large)
+            logger.debug(
+                "Download limits from AppConfig: small=%d large=%d",
+                self.max_concurrent_downloads_small,
+                self.max_concurrent_downloads_large,
+            )
+        except Exception as e:
+            logger.debug("Could not fetch AppConfig, keeping defaults: %s", e)
+
     async def translate_text(self, text: str, target_lang: str = None) -> str:
-        print(f"DEBUG: Translating text length {len(text) if text else 0}")
         if not self.ai_client:
-            print("DEBUG: No AI client initialized")
+            logger.debug("No AI client initialized")
             return text
         if not text or len(text) < 2:
             return text
 
         lang = target_lang or self.target_lang
-        print(
-            f"DEBUG: Sending request to AI model: {self.ai_model} for language: {lang}"
+
+        # Cheap pre-filter: when targeting English, overwhelmingly-ASCII
+        # text (links, emojis aside) is almost certainly English already,
+        # so skip the 300-1500ms LLM round-trip entirely. The model would
+        # return nothing for such input anyway.
+        if lang.lower().startswith("english"):
+            ascii_ratio = sum(1 for c in text if ord(c) < 128) / len(text)
+            if ascii_ratio > 0.9:
+                logger.debug("Skipping translation, text looks like %s", lang)
+                return text
+
+        # Lazy %-formatting: nothing is computed unless DEBUG is enabled
+        logger.debug(
+            "Sending %d chars to AI model %s for language %s",
+            len(text),
+            self.ai_model,
+            lang,
         )
 
         try:
-            response = await self.ai_client.chat.completions.create(
-                model=self.ai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"Translate the following Telegram post to {lang}. Keep emojis and formatting. Output ONLY the translation. If it is already in {lang}, return nothing.",
-                    },
-                    {"role": "user", "content": text},
-                ],
+            # Retry only rate-limit errors; anything else falls through to
+            # the generic handler below and keeps the original text
+            response = await _retry(
+                lambda: self.ai_client.chat.completions.create(
+                    model=self.ai_model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": f"Translate the following Telegram post to {lang}. Keep emojis and formatting. Output ONLY the translation. If it is already in {lang}, return nothing.",
+                        },
+                        {"role": "user", "content": text},
+                    ],
+                ),
+                retry_on=(RateLimitError,) if RateLimitError else (),
             )
             translation = response.choices[0].message.content.strip()
-            print(f"DEBUG: AI Response: {translation[:50]}...")
+            logger.debug("AI response: %.50s...", translation)
             if translation:
                 return f"{text}\n\n[Translation]:\n{translation}"
             return text
         except Exception as e:
-            print(f"[WARN] Translation failed: {e}")
+            logger.warning("Translation failed: %s", e)
             return text
 
+    async def _translate_group(self, messages: List[MessageData], lang: str):
+        """Translate a group of messages with a single LLM call.
+
+        Each post is tagged with a numeric ID in the prompt and the
+        response is parsed back by ID; posts the model reports as already
+        in the target language are left untouched.
+        """
+        prompt = "\n".join(
+            f"[{i}] {msg.message}" for i, msg in enumerate(messages, 1)
+        )
+        try:
+            response = await _retry(
+                lambda: self.ai_client.chat.completions.create(
+                    model=self.ai_model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": (
+                                f"Translate each of the following Telegram posts to {lang}. "
+                                "Keep emojis and formatting. Output ONLY the translations, "
+                                "each prefixed with its numeric ID in square brackets on its "
+                                f"own item, like the input. If a post is already in {lang}, "
+                                "output its ID with nothing after it."
+                            ),
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                ),
+                retry_on=(RateLimitError,) if RateLimitError else (),
+            )
+            content = response.choices[0].message.content or ""
+        except Exception as e:
+            logger.warning("Batch translation failed: %s", e)
+            return
+
+        translations = {
+            int(m.group(1)): m.group(2).strip()
+            for m in _TRANSLATION_ITEM_RE.finditer(content)
+        }
+        for i, msg in enumerate(messages, 1):
+            translation = translations.get(i)
+            if translation:
+                msg.message = f"{msg.message}\n\n[Translation]:\n{translation}"
+
+    async def translate_batch(
+        self, messages: List[MessageData], target_lang: str = None
+    ):
+        """Translate a batch of messages in grouped prompts.
+
+        One LLM call per translation_batch_size messages instead of one
+        per message — the round-trip and prompt overhead are amortized
+        across the group, and groups still run concurrently under the
+        translation semaphore.
+        """
+        if not self.ai_client:
+            return
+
+        lang = target_lang or self.target_lang
+        pending = [
+            msg for msg in messages if msg.message and len(msg.message) >= 2
+        ]
+        if lang.lower().startswith("english"):
+            # Same ASCII pre-filter as translate_text: don't spend prompt
+            # tokens on posts that are already in the target language
+            pending = [
+                msg
+                for msg in pending
+                if sum(1 for c in msg.message if ord(c) < 128) / len(msg.message)
+                <= 0.9
+            ]
+        if not pending:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_translations)
+
+        async def _translate(group):
+            async with semaphore:
+                await self._translate_group(group, lang)
+
+        size = self.translation_batch_size
+        await asyncio.gather(
+            *(
+                _translate(pending[i : i + size])
+                for i in range(0, len(pending), size)
+            )
+        )
+
     def load_state(self) -> Dict[str, Any]:
         if os.path.exists(self.STATE_FILE):
             try:
                 with open(self.STATE_FILE, "r") as f:
-                    return json.load(f)
+                    state = json.load(f)
+                self._merge_offset_sidecars(state)
+                return state
             except:
                 pass
         return {
@@ -198,14 +583,106 @@ class OptimizedTelegramScraper:
             "message_limit": None,
         }
 
+    @staticmethod
+    def _merge_offset_sidecars(state: Dict[str, Any]):
+        """Fold .offset sidecar checkpoints back into the loaded state.
+
+        Mid-scrape progress is checkpointed to the sidecars rather than
+        state.json, so after a crash the sidecar may be ahead of the last
+        full state write.
+        """
+        for channel, last_id in state.get("channels", {}).items():
+            offset_file = Path("channels") / channel / ".offset"
+            try:
+                sidecar_id = int.from_bytes(offset_file.read_bytes()[:8], "big")
+            except (OSError, ValueError):
+                continue
+            if sidecar_id > (last_id or 0):
+                state["channels"][channel] = sidecar_id
+
+    def _record_offset(self, channel: str, message_id: int):
+        """Checkpoint scrape progress with a single 8-byte pwrite.
+
+        Called from the writer thread after an insert transaction commits;
+        the write stays in the page cache and costs microseconds.
+        """
+        fd = self._offset_fds.get(channel)
+        if fd is None:
+            offset_file = Path("channels") / channel / ".offset"
+            offset_file.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(offset_file), os.O_RDWR | os.O_CREAT, 0o644)
+            self._offset_fds[channel] = fd
+        os.pwrite(fd, message_id.to_bytes(8, "big"), 0)
+
     def save_state(self):
+        if self._defer_state_saves:
+            self._state_dirty = True
+            return
+
+        now = time.monotonic()
+        if now - self._last_state_write_ts >= 1.0:
+            self._last_state_write_ts = now
+            self._write_state()
+            return
+
+        # Within the debounce window: schedule one trailing write so the
+        # latest state still lands without a rewrite per call
+        if self._state_flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._write_state()
+                return
+            self._state_flush_handle = loop.call_later(1.0, self._flush_state_later)
+
+    def _flush_state_later(self):
+        self._state_flush_handle = None
+        self._last_state_write_ts = time.monotonic()
+        self._write_state()
+
+    def _write_state(self):
+        try:
+            if orjson is not None:
+                payload = orjson.dumps(self.state, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.state, indent=2).encode("utf-8")
+        except Exception as e:
+            print(f"Failed to save state: {e}")
+            return
+
+        # Skip the rewrite entirely when nothing changed
+        if payload == self._last_state_bytes:
+            return
+        self._last_state_bytes = payload
+
+        # Push the disk I/O onto a worker thread when the loop is running;
+        # serialization above is cheap but fsync-ish file churn is not
         try:
-            with open(self.STATE_FILE, "w") as f:
-                json.dump(self.state, f, indent=2)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_state_payload(payload)
+        else:
+            loop.run_in_executor(None, self._write_state_payload, payload)
+
+    def _write_state_payload(self, payload: bytes):
+        try:
+            with self._state_write_lock:
+                # Write to a temp file and rename so a crash mid-write can't
+                # leave a truncated state.json behind
+                tmp_file = self.STATE_FILE + ".tmp"
+                with open(tmp_file, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_file, self.STATE_FILE)
         except Exception as e:
             print(f"Failed to save state: {e}")
 
     def get_db_connection(self, channel: str) -> sqlite3.Connection:
+        """Return the pooled connection for a channel, opening it on first use.
+
+        Connections live for the process: the WAL/cache/mmap pragmas are
+        applied once and SQLite's page cache stays warm between the
+        scrape, export, and feed paths that all come through here.
+        """
         if channel not in self.db_connections:
             channel_dir = Path("channels") / channel
             channel_dir.mkdir(parents=True, exist_ok=True)
@@ -221,8 +698,30 @@ class OptimizedTelegramScraper:
                 "CREATE INDEX IF NOT EXISTS idx_message_id ON messages(message_id)"
             )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_date ON messages(date)")
+            # Partial index sized by the missing rows, so the media repair
+            # selections don't scan the whole table every invocation. The
+            # predicate must cover both repair filters (NULL and empty
+            # string), or the planner falls back to a full scan for the
+            # fix_missing_media selection
+            existing = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index'"
+                " AND name = 'idx_missing_media'"
+            ).fetchone()
+            if existing and "media_path = ''" not in existing[0]:
+                # Databases created while the predicate was narrower carry
+                # an index the planner can't apply to the '' filter
+                conn.execute("DROP INDEX idx_missing_media")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_missing_media ON messages(message_id)"
+                " WHERE media_type IS NOT NULL"
+                " AND media_type != 'MessageMediaWebPage'"
+                " AND (media_path IS NULL OR media_path = '')"
+            )
             conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA mmap_size=268435456")
             conn.commit()
 
             self.migrate_database(conn)
@@ -256,53 +755,163 @@ class OptimizedTelegramScraper:
             conn.commit()
 
     def close_db_connections(self):
+        if self._write_task is not None:
+            self._write_task.cancel()
+            self._write_task = None
+        if self._state_flush_handle is not None:
+            # Don't lose a debounced save on shutdown
+            self._state_flush_handle.cancel()
+            self._state_flush_handle = None
+            self._write_state()
+        for fd in self._offset_fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._offset_fds.clear()
         for conn in self.db_connections.values():
+            try:
+                # Lets SQLite refresh planner statistics when worthwhile, so
+                # ORDER BY date keeps using idx_date as tables grow
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
             conn.close()
         self.db_connections.clear()
-
-    def batch_insert_messages(self, channel: str, messages: List[MessageData]):
+        if self._feed_conn is not None:
+            self._feed_conn.close()
+            self._feed_conn = None
+            self._feed_attached.clear()
+            self._feed_query_cache.clear()
+
+    async def batch_insert_messages(
+        self, channel: str, messages: List[MessageData], channel_name: str = None
+    ):
         if not messages:
             return
 
         if self.supabase:
-            self.upload_batch_to_supabase(channel, messages)
+            await self.upload_batch_to_supabase(channel, messages, channel_name)
+
+        # Buffer rows and flush them in one explicit transaction so we pay
+        # a single fsync per ~insert_flush_threshold rows instead of per batch
+        # MessageData field order matches the INSERT column order, so astuple
+        # yields the executemany row directly — no hand-maintained 14-field
+        # materialization per message
+        pending = self._pending_rows.setdefault(channel, [])
+        pending.extend(map(astuple, messages))
+
+        if len(pending) >= self.insert_flush_threshold:
+            await self.flush_pending_rows(channel)
+
+    def _ensure_writer(self):
+        if self._write_task is None or self._write_task.done():
+            self._write_queue = asyncio.Queue(maxsize=1000)
+            self._write_task = asyncio.create_task(self._db_writer())
+
+    async def _db_writer(self):
+        """Queue consumer applying DB writes off-loop, one drain per cycle."""
+        while True:
+            try:
+                ops = [await self._write_queue.get()]
+                while not self._write_queue.empty():
+                    ops.append(self._write_queue.get_nowait())
+            except asyncio.CancelledError:
+                break
 
-        conn = self.get_db_connection(channel)
-        data = [
-            (
-                msg.message_id,
-                msg.date,
-                msg.sender_id,
-                msg.first_name,
-                msg.last_name,
-                msg.username,
-                msg.message,
-                msg.media_type,
-                msg.media_path,
-                msg.reply_to,
-                msg.post_author,
-                msg.views,
-                msg.forwards,
-                msg.reactions,
-            )
-            for msg in messages
-        ]
+            try:
+                await asyncio.to_thread(self._apply_write_ops, ops)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning("DB writer error: %s", e)
+            finally:
+                for _ in ops:
+                    self._write_queue.task_done()
+
+    def _apply_write_ops(self, ops):
+        """Runs on the writer thread. WAL allows only one writer, so a single
+        consumer avoids writer contention entirely."""
+        inserts = {}
+        updates = {}
+        for op in ops:
+            if op[0] == "insert":
+                inserts.setdefault(op[1], []).extend(op[2])
+            else:
+                _, channel, message_id, media_path = op
+                updates.setdefault(channel, []).append((media_path, message_id))
 
-        conn.executemany(
-            """INSERT OR IGNORE INTO messages
-                           (message_id, date, sender_id, first_name, last_name, username,
-                            message, media_type, media_path, reply_to, post_author, views,
-                            forwards, reactions)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            data,
-        )
-        conn.commit()
+        for channel, rows in inserts.items():
+            conn = self.get_db_connection(channel)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(INSERT_MESSAGES_SQL, rows)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                # Remember the loss per channel (checked after the drain) and
+                # keep going so one bad database doesn't drop other channels'
+                # writes from this drain
+                self._insert_failures.add(channel)
+                logger.warning("Insert flush failed for %s: %s", channel, e)
+                continue
+            # Checkpoint only ids that just committed: recording ahead of
+            # the flush would make a post-crash resume skip buffered rows
+            if channel in self._offset_tracked and rows:
+                self._record_offset(channel, max(row[0] for row in rows))
+
+        # Media-path updates arrive one per download; grouping a drain's worth
+        # into a single executemany transaction pays one fsync instead of one
+        # per file
+        for channel, pairs in updates.items():
+            conn = self.get_db_connection(channel)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(UPDATE_MEDIA_PATH_SQL, pairs)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    async def _drain_writes(self):
+        """Wait until every queued DB write has been applied."""
+        if self._write_queue is not None:
+            await self._write_queue.join()
+
+    def _write_progress(self, text: str, done: bool = False):
+        """Throttled progress output: at most ~10 updates/sec plus the final one.
+
+        The per-message write+flush was one syscall per row, which stalls the
+        event loop on big channels.
+        """
+        now = time.monotonic()
+        if not done and now - self._last_progress_ts < 0.1:
+            return
+        self._last_progress_ts = now
+        sys.stdout.write(text)
+        # Flushing only matters for live terminal redraws; when piped to a
+        # log the extra syscall per update buys nothing
+        if self._stdout_isatty:
+            sys.stdout.flush()
+
+    async def flush_pending_rows(self, channel: str):
+        """Hand buffered rows for a channel to the writer task."""
+        rows = self._pending_rows.get(channel)
+        if not rows:
+            return
+
+        self._ensure_writer()
+        await self._write_queue.put(("insert", channel, list(rows)))
+        rows.clear()
 
-    def upload_batch_to_supabase(self, channel: str, messages: List[MessageData]):
+    async def upload_batch_to_supabase(
+        self, channel: str, messages: List[MessageData], channel_name: str = None
+    ):
         if not self.supabase:
             return
 
-        channel_name = self.state.get("channel_names", {}).get(channel, "Unknown")
+        if channel_name is None:
+            channel_name = self.state.get("channel_names", {}).get(channel, "Unknown")
 
         # Convert MessageData objects to dictionaries matching Supabase schema
         records = []
@@ -324,42 +933,52 @@ class OptimizedTelegramScraper:
 
         # Bulk upsert to Supabase
         if records:
-            self.supabase.save_message(os.getenv("SUPABASE_TABLE", "messages"), records)
+            await self.supabase.save_messages(
+                os.getenv("SUPABASE_TABLE", "messages"), records
+            )
 
     async def download_media(self, channel: str, message) -> Optional[str]:
         if not message.media or not self.state["scrape_media"]:
             return None
 
-        if isinstance(message.media, MessageMediaWebPage):
+        meta_handler = _MEDIA_META_HANDLERS.get(type(message.media))
+        if meta_handler is None:
             return None
 
         try:
-            channel_dir = Path("channels") / channel
-            media_folder = channel_dir / "media"
-            media_folder.mkdir(parents=True, exist_ok=True)
-
-            if isinstance(message.media, MessageMediaPhoto):
-                original_name = getattr(message.file, "name", None) or "photo.jpg"
-                ext = "jpg"
-            elif isinstance(message.media, MessageMediaDocument):
-                ext = getattr(message.file, "ext", "bin") if message.file else "bin"
-                original_name = getattr(message.file, "name", None) or f"document.{ext}"
-            else:
-                return None
+            media_folder = Path("channels") / channel / "media"
+            if channel not in self._media_dirs:
+                await asyncio.to_thread(
+                    media_folder.mkdir, parents=True, exist_ok=True
+                )
+                self._media_dirs.add(channel)
+
+            original_name, ext = meta_handler(message)
 
             base_name = Path(original_name).stem
             extension = Path(original_name).suffix or f".{ext}"
             unique_filename = f"{message.id}-{base_name}{extension}"
             media_path = media_folder / unique_filename
 
-            existing_files = list(media_folder.glob(f"{message.id}-*"))
-            if existing_files:
-                return str(existing_files[0])
+            # Dedup via the indexed message_id lookup instead of globbing the
+            # media folder (O(files) readdir per message on big channels)
+            row = (
+                self.get_db_connection(channel)
+                .execute(
+                    "SELECT media_path FROM messages WHERE message_id = ? AND media_path IS NOT NULL",
+                    (message.id,),
+                )
+                .fetchone()
+            )
+            if row and await asyncio.to_thread(os.path.exists, row[0]):
+                return row[0]
 
             for attempt in range(3):
                 try:
                     downloaded_path = await message.download_media(file=str(media_path))
-                    if downloaded_path and Path(downloaded_path).exists():
+                    if downloaded_path and await asyncio.to_thread(
+                        os.path.exists, downloaded_path
+                    ):
                         return downloaded_path
                     else:
                         return None
@@ -370,7 +989,7 @@ class OptimizedTelegramScraper:
                         return None
                 except Exception:
                     if attempt < 2:
-                        await asyncio.sleep(2**attempt)
+                        await asyncio.sleep(2**attempt * (1 + random.random() * 0.5))
                     else:
                         return None
 
@@ -379,12 +998,11 @@ class OptimizedTelegramScraper:
             return None
 
     async def update_media_path(self, channel: str, message_id: int, media_path: str):
-        conn = self.get_db_connection(channel)
-        conn.execute(
-            "UPDATE messages SET media_path = ? WHERE message_id = ?",
-            (media_path, message_id),
-        )
-        conn.commit()
+        # Queued rather than applied inline: the writer thread groups a
+        # drain's worth of these into one executemany transaction, so the
+        # download loops never pay a per-row COMMIT
+        self._ensure_writer()
+        await self._write_queue.put(("update", channel, message_id, media_path))
 
         if self.supabase:
             # Upload to Supabase Storage
@@ -393,25 +1011,55 @@ class OptimizedTelegramScraper:
                 file_name = os.path.basename(media_path)
                 storage_path = f"{channel}/{file_name}"
 
-                public_url = self.supabase.upload_media(
+                public_url = await self.supabase.upload_media(
                     bucket, media_path, storage_path
                 )
 
                 if public_url:
-                    # Update the record in Supabase with the public URL
-                    self.supabase.save_message(
-                        os.getenv("SUPABASE_TABLE", "messages"),
-                        [
-                            {
-                                "message_id": message_id,
-                                "channel_id": channel,
-                                "media_path": public_url,
-                            }
-                        ],
+                    # Buffer the URL update; one bulk upsert per ~100 files
+                    # instead of one HTTP round-trip per file
+                    pending = self._pending_media_urls.setdefault(channel, [])
+                    pending.append(
+                        {
+                            "message_id": message_id,
+                            "channel_id": channel,
+                            "media_path": public_url,
+                        }
                     )
+                    if len(pending) >= self.media_url_flush_threshold:
+                        await self.flush_media_urls(channel)
             except Exception as e:
                 print(f"Failed to upload media to Supabase: {e}")
 
+    async def flush_media_urls(self, channel: str):
+        """Push buffered Supabase media-URL updates as one bulk upsert."""
+        records = self._pending_media_urls.get(channel)
+        if not records or not self.supabase:
+            return
+
+        await self.supabase.save_messages(
+            os.getenv("SUPABASE_TABLE", "messages"), list(records)
+        )
+        records.clear()
+
+    async def get_entity_cached(self, channel: str, ttl: float = 3600.0):
+        """Resolve a channel entity and reuse it for up to ttl seconds.
+
+        Continuous scraping re-enters every channel each minute; entities
+        rarely change, so the TTL keeps resolve RPCs to roughly one per
+        channel per hour instead of one per poll cycle.
+        """
+        cached = self._entity_cache.get(channel)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+
+        if channel.lstrip("-").isdigit():
+            entity = await self.client.get_entity(PeerChannel(int(channel)))
+        else:
+            entity = await self.client.get_entity(channel)
+        self._entity_cache[channel] = (time.monotonic(), entity)
+        return entity
+
     async def download_channel_photo(self, channel: str, entity) -> Optional[str]:
         """Download channel profile picture"""
         try:
@@ -442,348 +1090,356 @@ class OptimizedTelegramScraper:
             print(f"[WARN] Failed to download channel photo: {e}")
             return None
 
-    async def scrape_channel(
+    def _build_message_data(self, message, sender) -> MessageData:
+        """Turn a Telethon message plus its resolved sender into a row."""
+        reactions_str = None
+        if message.reactions and message.reactions.results:
+            reactions_parts = []
+            for reaction in message.reactions.results:
+                emoji = getattr(reaction.reaction, "emoticon", "")
+                count = reaction.count
+                if emoji:
+                    reactions_parts.append(f"{emoji} {count}")
+            if reactions_parts:
+                reactions_str = " ".join(reactions_parts)
+
+        message_text = message.message or ""
+
+        # Extract button URLs from reply_markup
+        button_urls = extract_button_urls(message)
+        if button_urls:
+            message_text += button_urls
+
+        is_user = isinstance(sender, User)
+        return MessageData(
+            message_id=message.id,
+            date=_fmt_dt(message.date),
+            sender_id=message.sender_id,
+            first_name=getattr(sender, "first_name", None) if is_user else None,
+            last_name=getattr(sender, "last_name", None) if is_user else None,
+            username=getattr(sender, "username", None) if is_user else None,
+            message=message_text,
+            media_type=message.media.__class__.__name__ if message.media else None,
+            media_path=None,
+            reply_to=message.reply_to_msg_id if message.reply_to else None,
+            post_author=message.post_author,
+            views=message.views,
+            forwards=message.forwards,
+            reactions=reactions_str,
+        )
+
+    async def _process_messages(
         self,
         channel: str,
-        offset_id: int,
-        force_rescrape: bool = False,
-        target_lang: str = None,
+        entity,
+        iter_kwargs: Dict[str, Any],
+        total_for_progress: int,
+        target_lang: str,
+        channel_name: str,
+        translate_default: bool,
+        track_offset: bool,
     ):
+        """Shared message loop for both scrape modes.
+
+        Iterates messages with the given iter_messages kwargs, batching
+        inserts/translation and collecting media work; returns
+        (collected_messages, media_tasks, processed_messages,
+        last_message_id).
+        """
         collected_messages = []
-        downloaded_media_paths = {}
-        try:
-            entity = await self.client.get_entity(
-                PeerChannel(int(channel)) if channel.startswith("-") else channel
-            )
+        message_batch = []
+        media_tasks = []
+        # Resolve each unique sender once per scrape; in broadcast channels
+        # nearly every message shares one sender, so this collapses N
+        # get_sender round-trips into a handful of dict hits
+        sender_map = {}
+        processed_messages = 0
+        last_message_id = iter_kwargs.get("offset_id", 0)
+
+        # The writer thread checkpoints the offset sidecar after each insert
+        # transaction commits, so a crash can never leave the sidecar ahead
+        # of the rows actually on disk
+        if track_offset:
+            self._offset_tracked.add(channel)
+        else:
+            self._offset_tracked.discard(channel)
 
-            # Download channel profile picture
-            await self.download_channel_photo(channel, entity)
+        async def _flush_batch():
+            if target_lang or translate_default:
+                await self.translate_batch(message_batch, target_lang)
+            await self.batch_insert_messages(channel, message_batch, channel_name)
+            message_batch.clear()
 
-            # If force_rescrape and message_limit is set, scrape only the newest N messages
-            if force_rescrape and self.state.get("message_limit"):
-                message_limit = self.state["message_limit"]
-                print(
-                    f"Force rescaping last {message_limit} messages from channel {channel}"
-                )
+        async for message in self.client.iter_messages(entity, **iter_kwargs):
+            try:
+                if message.sender_id in sender_map:
+                    sender = sender_map[message.sender_id]
+                else:
+                    sender = await message.get_sender()
+                    sender_map[message.sender_id] = sender
 
-                message_batch = []
-                media_tasks = []
-                processed_messages = 0
+                msg_data = self._build_message_data(message, sender)
+                message_batch.append(msg_data)
+                collected_messages.append(msg_data)
 
-                async for message in self.client.iter_messages(
-                    entity, limit=message_limit
+                if (
+                    self.state["scrape_media"]
+                    and message.media
+                    and not isinstance(message.media, MessageMediaWebPage)
                 ):
-                    try:
-                        sender = await message.get_sender()
-
-                        reactions_str = None
-                        if message.reactions and message.reactions.results:
-                            reactions_parts = []
-                            for reaction in message.reactions.results:
-                                emoji = getattr(reaction.reaction, "emoticon", "")
-                                count = reaction.count
-                                if emoji:
-                                    reactions_parts.append(f"{emoji} {count}")
-                            if reactions_parts:
-                                reactions_str = " ".join(reactions_parts)
-
-                        message_text = message.message or ""
-                        
-                        # Extract button URLs from reply_markup
-                        button_urls = extract_button_urls(message)
-                        if button_urls:
-                            message_text += button_urls
-
-                        # Translate if AI client is available
-                        if self.ai_client and message_text and target_lang:
-                            message_text = await self.translate_text(
-                                message_text, target_lang
-                            )
-
-                        # Create message data (always, not just when translating)
-                        msg_data = MessageData(
-                            message_id=message.id,
-                            date=message.date.strftime("%Y-%m-%d %H:%M:%S"),
-                            sender_id=message.sender_id,
-                            first_name=getattr(sender, "first_name", None)
-                            if isinstance(sender, User)
-                            else None,
-                            last_name=getattr(sender, "last_name", None)
-                            if isinstance(sender, User)
-                            else None,
-                            username=getattr(sender, "username", None)
-                            if isinstance(sender, User)
-                            else None,
-                            message=message_text,
-                            media_type=message.media.__class__.__name__
-                            if message.media
-                            else None,
-                            media_path=None,
-                            reply_to=message.reply_to_msg_id
-                            if message.reply_to
-                            else None,
-                            post_author=message.post_author,
-                            views=message.views,
-                            forwards=message.forwards,
-                            reactions=reactions_str,
-                        )
-
-                        message_batch.append(msg_data)
-                        collected_messages.append(msg_data)
+                    media_tasks.append(message)
 
-                        if (
-                            self.state["scrape_media"]
-                            and message.media
-                            and not isinstance(message.media, MessageMediaWebPage)
-                        ):
-                            media_tasks.append(message)
+                last_message_id = message.id
+                processed_messages += 1
 
-                        processed_messages += 1
+                if len(message_batch) >= self.batch_size:
+                    await _flush_batch()
 
-                        if len(message_batch) >= self.batch_size:
-                            self.batch_insert_messages(channel, message_batch)
-                            message_batch.clear()
+                if total_for_progress:
+                    progress = (processed_messages / total_for_progress) * 100
+                    bar = _BAR_CACHE[30 * processed_messages // total_for_progress]
 
-                        sys.stdout.write(
-                            f"\rMessages: {processed_messages}/{message_limit}"
-                        )
-                        sys.stdout.flush()
-
-                    except Exception as e:
-                        print(f"\nError processing message {message.id}: {e}")
-
-                if message_batch:
-                    self.batch_insert_messages(channel, message_batch)
-
-                if media_tasks:
-                    total_media = len(media_tasks)
-                    completed_media = 0
-                    successful_downloads = 0
-                    print(f"\nDownloading {total_media} media files...")
-
-                    semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
-
-                    async def download_single_media(message):
-                        async with semaphore:
-                            return await self.download_media(channel, message)
-
-                    batch_size = 10
-                    for i in range(0, len(media_tasks), batch_size):
-                        batch = media_tasks[i : i + batch_size]
-                        tasks = [
-                            asyncio.create_task(download_single_media(msg))
-                            for msg in batch
-                        ]
-
-                        for j, task in enumerate(tasks):
-                            try:
-                                media_path = await task
-                                if media_path:
-                                    await self.update_media_path(
-                                        channel, batch[j].id, media_path
-                                    )
-                                    downloaded_media_paths[batch[j].id] = str(
-                                        media_path
-                                    )
-                                    successful_downloads += 1
-                            except Exception:
-                                pass
-
-                            completed_media += 1
-                            progress = (completed_media / total_media) * 100
-                            bar_length = 30
-                            filled_length = int(
-                                bar_length * completed_media // total_media
-                            )
-                            bar = "█" * filled_length + "░" * (
-                                bar_length - filled_length
-                            )
-
-                            sys.stdout.write(
-                                f"\rMedia: [{bar}] {progress:.1f}% ({completed_media}/{total_media})"
-                            )
-                            sys.stdout.flush()
-
-                    print(
-                        f"\n[INFO] Media download complete! ({successful_downloads}/{total_media} successful)"
+                    self._write_progress(
+                        f"\rMessages: [{bar}] {progress:.1f}% ({processed_messages}/{total_for_progress})",
+                        done=processed_messages == total_for_progress,
                     )
 
-                print(
-                    f"\n[INFO] Completed force rescrape of {processed_messages} messages from channel {channel}"
-                )
-                for msg in collected_messages:
-                    if msg.message_id in downloaded_media_paths:
-                        msg.media_path = downloaded_media_paths[msg.message_id]
-                return collected_messages
-
-            result = await self.client.get_messages(
-                entity, offset_id=offset_id, reverse=True, limit=0
+            except Exception as e:
+                print(f"\nError processing message {message.id}: {e}")
+
+        if message_batch:
+            await _flush_batch()
+        await self.flush_pending_rows(channel)
+        await self._drain_writes()
+
+        return collected_messages, media_tasks, processed_messages, last_message_id
+
+    async def _drain_media_tasks(
+        self, channel: str, media_tasks, messages_by_id: Dict[int, MessageData]
+    ) -> int:
+        """Download collected media concurrently and persist the paths.
+
+        Returns the number of successful downloads; each path is written
+        straight onto its MessageData as downloads complete, so no
+        reattachment pass over the collected messages is needed.
+        """
+        total_media = len(media_tasks)
+        completed_media = 0
+        successful_downloads = 0
+
+        # One semaphore pair per media phase, sized per download queue
+        small_semaphore = asyncio.Semaphore(self.max_concurrent_downloads_small)
+        large_semaphore = asyncio.Semaphore(self.max_concurrent_downloads_large)
+
+        async def download_single_media(message):
+            # Photos ride Telegram's small-file queue, documents the large one
+            sem = (
+                small_semaphore
+                if isinstance(message.media, MessageMediaPhoto)
+                else large_semaphore
             )
-            total_messages = result.total
+            async with sem:
+                return await self.download_media(channel, message)
 
-            if total_messages == 0:
-                print(f"No messages found in channel {channel}")
-                return
-
-            print(f"Found {total_messages} messages in channel {channel}")
-
-            message_batch = []
-            media_tasks = []
-            processed_messages = 0
-            last_message_id = offset_id
-            semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
-
-            async for message in self.client.iter_messages(
-                entity, offset_id=offset_id, reverse=True
-            ):
-                try:
-                    sender = await message.get_sender()
+        async def download_with_id(message):
+            return message.id, await download_single_media(message)
 
-                    reactions_str = None
-                    if message.reactions and message.reactions.results:
-                        reactions_parts = []
-                        for reaction in message.reactions.results:
-                            emoji = getattr(reaction.reaction, "emoticon", "")
-                            count = reaction.count
-                            if emoji:
-                                reactions_parts.append(f"{emoji} {count}")
-                        if reactions_parts:
-                            reactions_str = " ".join(reactions_parts)
-
-                    message_text = message.message or ""
-                    
-                    # Extract button URLs from reply_markup
-                    button_urls = extract_button_urls(message)
-                    if button_urls:
-                        message_text += button_urls
-
-                    if self.ai_client and message_text:
-                        message_text = await self.translate_text(
-                            message_text, target_lang
-                        )
-
-                    msg_data = MessageData(
-                        message_id=message.id,
-                        date=message.date.strftime("%Y-%m-%d %H:%M:%S"),
-                        sender_id=message.sender_id,
-                        first_name=getattr(sender, "first_name", None)
-                        if isinstance(sender, User)
-                        else None,
-                        last_name=getattr(sender, "last_name", None)
-                        if isinstance(sender, User)
-                        else None,
-                        username=getattr(sender, "username", None)
-                        if isinstance(sender, User)
-                        else None,
-                        message=message_text,
-                        media_type=message.media.__class__.__name__
-                        if message.media
-                        else None,
-                        media_path=None,
-                        reply_to=message.reply_to_msg_id if message.reply_to else None,
-                        post_author=message.post_author,
-                        views=message.views,
-                        forwards=message.forwards,
-                        reactions=reactions_str,
-                    )
+        # Process completions as they happen so one slow download never
+        # delays the others' DB/Supabase updates; the semaphores already
+        # bound concurrency
+        for coro in asyncio.as_completed(
+            [download_with_id(msg) for msg in media_tasks]
+        ):
+            try:
+                message_id, media_path = await coro
+                if media_path:
+                    await self.update_media_path(channel, message_id, media_path)
+                    msg_data = messages_by_id.get(message_id)
+                    if msg_data is not None:
+                        msg_data.media_path = str(media_path)
+                    successful_downloads += 1
+            except Exception:
+                pass
 
-                    message_batch.append(msg_data)
-                    collected_messages.append(msg_data)
+            completed_media += 1
+            progress = (completed_media / total_media) * 100
+            bar = _BAR_CACHE[30 * completed_media // total_media]
 
-                    if (
-                        self.state["scrape_media"]
-                        and message.media
-                        and not isinstance(message.media, MessageMediaWebPage)
-                    ):
-                        media_tasks.append(message)
+            self._write_progress(
+                f"\rMedia: [{bar}] {progress:.1f}% ({completed_media}/{total_media})",
+                done=completed_media == total_media,
+            )
 
-                    last_message_id = message.id
-                    processed_messages += 1
+        return successful_downloads
 
-                    if len(message_batch) >= self.batch_size:
-                        self.batch_insert_messages(channel, message_batch)
-                        message_batch.clear()
+    async def scrape_channel(
+        self,
+        channel: str,
+        offset_id: int,
+        force_rescrape: bool = False,
+        target_lang: str = None,
+        limit: int = None,
+    ):
+        # Per-call limit wins over the shared state so concurrent callers
+        # with different limits don't interfere with each other
+        message_limit = limit or self.state.get("message_limit")
+        # A failure recorded by an earlier scrape shouldn't gate this one
+        self._insert_failures.discard(channel)
+        try:
+            entity = await self.get_entity_cached(channel)
+            # Looked up once per scrape instead of once per uploaded batch
+            channel_name = self.state.get("channel_names", {}).get(channel, "Unknown")
 
-                    if processed_messages % self.state_save_interval == 0:
-                        self.state["channels"][channel] = last_message_id
-                        self.save_state()
+            # Download channel profile picture
+            await self.download_channel_photo(channel, entity)
 
-                    progress = (processed_messages / total_messages) * 100
-                    bar_length = 30
-                    filled_length = int(
-                        bar_length * processed_messages // total_messages
-                    )
-                    bar = "█" * filled_length + "░" * (bar_length - filled_length)
+            # If force_rescrape and message_limit is set, scrape only the
+            # newest N messages
+            limited_rescrape = force_rescrape and message_limit
+            if limited_rescrape:
+                print(
+                    f"Force rescaping last {message_limit} messages from channel {channel}"
+                )
+                iter_kwargs = {"limit": message_limit}
+                total_for_progress = message_limit
+            else:
+                result = await self.client.get_messages(
+                    entity, offset_id=offset_id, reverse=True, limit=0
+                )
+                total_for_progress = result.total
 
-                    sys.stdout.write(
-                        f"\rMessages: [{bar}] {progress:.1f}% ({processed_messages}/{total_messages})"
-                    )
-                    sys.stdout.flush()
+                if total_for_progress == 0:
+                    print(f"No messages found in channel {channel}")
+                    return
 
-                except Exception as e:
-                    print(f"\nError processing message {message.id}: {e}")
+                print(f"Found {total_for_progress} messages in channel {channel}")
+                iter_kwargs = {"offset_id": offset_id, "reverse": True}
 
-            if message_batch:
-                self.batch_insert_messages(channel, message_batch)
+            (
+                collected_messages,
+                media_tasks,
+                processed_messages,
+                last_message_id,
+            ) = await self._process_messages(
+                channel,
+                entity,
+                iter_kwargs,
+                total_for_progress,
+                target_lang,
+                channel_name,
+                # The incremental path translates with the default language;
+                # limited rescrapes only translate when one was requested
+                translate_default=not limited_rescrape,
+                track_offset=not limited_rescrape,
+            )
 
             if media_tasks:
                 total_media = len(media_tasks)
-                completed_media = 0
-                successful_downloads = 0
                 print(f"\nDownloading {total_media} media files...")
+                messages_by_id = {
+                    msg.message_id: msg for msg in collected_messages
+                }
+                successful_downloads = await self._drain_media_tasks(
+                    channel, media_tasks, messages_by_id
+                )
+                print(
+                    f"\n[INFO] Media download complete! ({successful_downloads}/{total_media} successful)"
+                )
 
-                semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
-
-                async def download_single_media(message):
-                    async with semaphore:
-                        return await self.download_media(channel, message)
-
-                batch_size = 10
-                for i in range(0, len(media_tasks), batch_size):
-                    batch = media_tasks[i : i + batch_size]
-                    tasks = [
-                        asyncio.create_task(download_single_media(msg)) for msg in batch
-                    ]
-
-                    for j, task in enumerate(tasks):
-                        try:
-                            media_path = await task
-                            if media_path:
-                                await self.update_media_path(
-                                    channel, batch[j].id, media_path
-                                )
-                                downloaded_media_paths[batch[j].id] = str(media_path)
-                                successful_downloads += 1
-                        except Exception:
-                            pass
-
-                        completed_media += 1
-                        progress = (completed_media / total_media) * 100
-                        bar_length = 30
-                        filled_length = int(bar_length * completed_media // total_media)
-                        bar = "█" * filled_length + "░" * (bar_length - filled_length)
-
-                        sys.stdout.write(
-                            f"\rMedia: [{bar}] {progress:.1f}% ({completed_media}/{total_media})"
-                        )
-                        sys.stdout.flush()
+            # Ensure queued media-path updates hit the DB and Supabase before
+            # returning
+            await self.flush_media_urls(channel)
+            await self._drain_writes()
 
+            if limited_rescrape:
                 print(
-                    f"\n[INFO] Media download complete! ({successful_downloads}/{total_media} successful)"
+                    f"\n[INFO] Completed force rescrape of {processed_messages} messages from channel {channel}"
                 )
+            elif channel in self._insert_failures:
+                # Some rows never committed; leaving the offset where it was
+                # makes the next incremental scrape re-fetch them
+                print(
+                    f"\n[WARNING] Channel {channel}: some inserts failed;"
+                    " offset not advanced, messages will be re-scraped"
+                )
+            else:
+                self.state["channels"][channel] = last_message_id
+                self.save_state()
+                print(f"\nCompleted scraping channel {channel}")
 
-            self.state["channels"][channel] = last_message_id
-            self.save_state()
-            print(f"\nCompleted scraping channel {channel}")
-            for msg in collected_messages:
-                if msg.message_id in downloaded_media_paths:
-                    msg.media_path = downloaded_media_paths[msg.message_id]
             return collected_messages
 
         except Exception as e:
+            # Drop the cached entity so a stale/revoked handle is
+            # re-resolved on the next attempt
+            self._entity_cache.pop(channel, None)
             print(f"Error with channel {channel}: {e}")
             return []
 
+    async def _redownload_messages(
+        self, channel: str, message_ids: List[int], label: str
+    ) -> int:
+        """Re-fetch the given messages and download their media concurrently.
+
+        Messages are fetched in large id batches, then every download is
+        started at once — the download semaphore alone gates concurrency,
+        so no per-batch barrier serializes on the slowest file.
+        """
+        entity = await self.get_entity_cached(channel)
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+        total = len(message_ids)
+        completed_media = 0
+        successful_downloads = 0
+
+        # 100 ids per RPC — Telethon's maximum — so a backlog of N messages
+        # costs N/100 round-trips instead of N/10
+        fetch_batch = 100
+        valid_messages = []
+        for i in range(0, total, fetch_batch):
+            batch_ids = message_ids[i : i + fetch_batch]
+            while True:
+                try:
+                    messages = await self.client.get_messages(entity, ids=batch_ids)
+                    break
+                except FloodWaitError as e:
+                    await asyncio.sleep(e.seconds)
+            valid_messages.extend(
+                msg
+                for msg in messages
+                if msg
+                and msg.media
+                and not isinstance(msg.media, MessageMediaWebPage)
+            )
+
+        async def download_with_id(message):
+            async with semaphore:
+                return message.id, await self.download_media(channel, message)
+
+        for coro in asyncio.as_completed(
+            [download_with_id(msg) for msg in valid_messages]
+        ):
+            try:
+                message_id, media_path = await coro
+                if media_path:
+                    await self.update_media_path(channel, message_id, media_path)
+                    successful_downloads += 1
+            except Exception:
+                pass
+
+            completed_media += 1
+            progress = (completed_media / total) * 100
+            bar = _BAR_CACHE[30 * completed_media // total]
+
+            self._write_progress(
+                f"\r{label}: [{bar}] {progress:.1f}% ({completed_media}/{total})",
+                done=completed_media == total,
+            )
+
+        await self.flush_media_urls(channel)
+        await self._drain_writes()
+
+        return successful_downloads
+
     async def rescrape_media(self, channel: str):
         conn = self.get_db_connection(channel)
         cursor = conn.cursor()
@@ -803,58 +1459,9 @@ class OptimizedTelegramScraper:
         )
 
         try:
-            if channel.lstrip("-").isdigit():
-                entity = await self.client.get_entity(PeerChannel(int(channel)))
-            else:
-                entity = await self.client.get_entity(channel)
-            semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
-            completed_media = 0
-            successful_downloads = 0
-
-            async def download_single_media(message):
-                async with semaphore:
-                    return await self.download_media(channel, message)
-
-            batch_size = 10
-            for i in range(0, len(message_ids), batch_size):
-                batch_ids = message_ids[i : i + batch_size]
-                messages = await self.client.get_messages(entity, ids=batch_ids)
-
-                valid_messages = [
-                    msg
-                    for msg in messages
-                    if msg
-                    and msg.media
-                    and not isinstance(msg.media, MessageMediaWebPage)
-                ]
-                tasks = [
-                    asyncio.create_task(download_single_media(msg))
-                    for msg in valid_messages
-                ]
-
-                for j, task in enumerate(tasks):
-                    try:
-                        media_path = await task
-                        if media_path:
-                            await self.update_media_path(
-                                channel, valid_messages[j].id, media_path
-                            )
-                            successful_downloads += 1
-                    except Exception:
-                        pass
-
-                    completed_media += 1
-                    progress = (completed_media / len(message_ids)) * 100
-                    bar_length = 30
-                    filled_length = int(
-                        bar_length * completed_media // len(message_ids)
-                    )
-                    bar = "█" * filled_length + "░" * (bar_length - filled_length)
-
-                    sys.stdout.write(
-                        f"\rRescrape: [{bar}] {progress:.1f}% ({completed_media}/{len(message_ids)})"
-                    )
-                    sys.stdout.flush()
+            successful_downloads = await self._redownload_messages(
+                channel, message_ids, "Rescrape"
+            )
 
             print(
                 f"\n[INFO] Media reprocessing complete! ({successful_downloads}/{len(message_ids)} successful)"
@@ -867,15 +1474,11 @@ class OptimizedTelegramScraper:
         conn = self.get_db_connection(channel)
         cursor = conn.cursor()
 
+        # COUNT(media_path) skips NULLs, so one scan yields both totals
         cursor.execute(
-            'SELECT COUNT(*) FROM messages WHERE media_type IS NOT NULL AND media_type != "MessageMediaWebPage"'
+            'SELECT COUNT(*), COUNT(media_path) FROM messages WHERE media_type IS NOT NULL AND media_type != "MessageMediaWebPage"'
         )
-        total_with_media = cursor.fetchone()[0]
-
-        cursor.execute(
-            'SELECT COUNT(*) FROM messages WHERE media_type IS NOT NULL AND media_type != "MessageMediaWebPage" AND media_path IS NOT NULL'
-        )
-        total_with_files = cursor.fetchone()[0]
+        total_with_media, total_with_files = cursor.fetchone()
 
         missing_count = total_with_media - total_with_files
 
@@ -890,74 +1493,23 @@ class OptimizedTelegramScraper:
             return
 
         cursor.execute(
-            'SELECT message_id, media_type FROM messages WHERE media_type IS NOT NULL AND media_type != "MessageMediaWebPage" AND (media_path IS NULL OR media_path = "")'
+            'SELECT message_id FROM messages WHERE media_type IS NOT NULL AND media_type != "MessageMediaWebPage" AND (media_path IS NULL OR media_path = "")'
         )
-        missing_media = cursor.fetchall()
+        missing_ids = [row[0] for row in cursor.fetchall()]
 
-        if not missing_media:
+        if not missing_ids:
             print("[INFO] No missing media found!")
             return
 
-        print(f"\nAttempting to download {len(missing_media)} missing media files...")
+        print(f"\nAttempting to download {len(missing_ids)} missing media files...")
 
         try:
-            if channel.lstrip("-").isdigit():
-                entity = await self.client.get_entity(PeerChannel(int(channel)))
-            else:
-                entity = await self.client.get_entity(channel)
-            semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
-            completed_media = 0
-            successful_downloads = 0
-
-            async def download_single_media(message):
-                async with semaphore:
-                    return await self.download_media(channel, message)
-
-            batch_size = 10
-            for i in range(0, len(missing_media), batch_size):
-                batch = missing_media[i : i + batch_size]
-                message_ids = [msg[0] for msg in batch]
-
-                messages = await self.client.get_messages(entity, ids=message_ids)
-                valid_messages = [
-                    msg
-                    for msg in messages
-                    if msg
-                    and msg.media
-                    and not isinstance(msg.media, MessageMediaWebPage)
-                ]
-
-                tasks = [
-                    asyncio.create_task(download_single_media(msg))
-                    for msg in valid_messages
-                ]
-
-                for j, task in enumerate(tasks):
-                    try:
-                        media_path = await task
-                        if media_path:
-                            await self.update_media_path(
-                                channel, valid_messages[j].id, media_path
-                            )
-                            successful_downloads += 1
-                    except Exception:
-                        pass
-
-                    completed_media += 1
-                    progress = (completed_media / len(missing_media)) * 100
-                    bar_length = 30
-                    filled_length = int(
-                        bar_length * completed_media // len(missing_media)
-                    )
-                    bar = "█" * filled_length + "░" * (bar_length - filled_length)
-
-                    sys.stdout.write(
-                        f"\rFix Media: [{bar}] {progress:.1f}% ({completed_media}/{len(missing_media)})"
-                    )
-                    sys.stdout.flush()
+            successful_downloads = await self._redownload_messages(
+                channel, missing_ids, "Fix Media"
+            )
 
             print(
-                f"\n[INFO] Media fix complete! ({successful_downloads}/{len(missing_media)} successful)"
+                f"\n[INFO] Media fix complete! ({successful_downloads}/{len(missing_ids)} successful)"
             )
 
         except Exception as e:
@@ -966,15 +1518,38 @@ class OptimizedTelegramScraper:
     async def continuous_scraping(self):
         self.continuous_scraping_active = True
 
+        # Channels are mostly waiting on Telegram, so overlapping them cuts a
+        # poll cycle from sum-of-channels to roughly the slowest channel;
+        # the semaphore keeps the session from juggling too many at once
+        semaphore = asyncio.Semaphore(5)
+
+        async def scrape_one(channel):
+            async with semaphore:
+                if not self.continuous_scraping_active:
+                    return
+                print(f"\nChecking for new messages in channel: {channel}")
+                await self.scrape_channel(channel, self.state["channels"][channel])
+
         try:
             while self.continuous_scraping_active:
                 start_time = time.time()
 
-                for channel in self.state["channels"]:
-                    if not self.continuous_scraping_active:
-                        break
-                    print(f"\nChecking for new messages in channel: {channel}")
-                    await self.scrape_channel(channel, self.state["channels"][channel])
+                # Snapshot so channels added/removed mid-cycle don't mutate
+                # the iteration. State saves are deferred for the cycle so K
+                # channels cost one state write, not K
+                self._defer_state_saves = True
+                try:
+                    await asyncio.gather(
+                        *(
+                            scrape_one(channel)
+                            for channel in tuple(self.state["channels"])
+                        )
+                    )
+                finally:
+                    self._defer_state_saves = False
+                    if self._state_dirty:
+                        self._state_dirty = False
+                        self.save_state()
 
                 elapsed = time.time() - start_time
                 sleep_time = max(0, 60 - elapsed)
@@ -986,170 +1561,312 @@ class OptimizedTelegramScraper:
         finally:
             self.continuous_scraping_active = False
 
-    def get_recent_messages(self, limit: int = 20) -> List[Dict]:
-        """Fetch recent messages from all channels combined"""
-        all_messages = []
+    def _ensure_feed_conn(self) -> sqlite3.Connection:
+        if self._feed_conn is None:
+            self._feed_conn = sqlite3.connect(":memory:", check_same_thread=False)
+        return self._feed_conn
+
+    def _attach_feed_db(self, channel: str) -> str:
+        """Attach a channel DB to the shared read connection, once."""
+        alias = self._feed_attached.get(channel)
+        if alias is None:
+            # Ensure the DB and its schema exist before attaching
+            self.get_db_connection(channel)
+            alias = "ch_" + channel.lstrip("-")
+            db_file = Path("channels") / channel / f"{channel}.db"
+            self._feed_conn.execute(
+                f"ATTACH DATABASE ? AS {alias}", (str(db_file),)
+            )
+            self._feed_attached[channel] = alias
+        return alias
 
-        for channel in self.state.get("channels", {}):
+    def _detach_feed_dbs(self):
+        """Detach every channel DB from the shared read connection."""
+        for alias in self._feed_attached.values():
             try:
-                conn = self.get_db_connection(channel)
-                cursor = conn.cursor()
-                # Get channel name
-                channel_name = self.state.get("channel_names", {}).get(
-                    channel, "Unknown"
+                self._feed_conn.execute(f"DETACH DATABASE {alias}")
+            except sqlite3.Error:
+                pass
+        self._feed_attached.clear()
+
+    def _feed_union_rows(self, channels, select_fmt, suffix="", params=()):
+        """Run select_fmt per channel, UNION ALL'd, on the shared connection.
+
+        SQLite caps attached databases at _MAX_ATTACHED_DBS, so accounts
+        with more channels than that are queried one group at a time with a
+        detach between groups; smaller accounts keep their attachments (and
+        the assembled query text) warm across calls.
+        """
+        conn = self._ensure_feed_conn()
+        if len(channels) <= _MAX_ATTACHED_DBS:
+            aliases = [self._attach_feed_db(channel) for channel in channels]
+            key = (select_fmt, suffix, tuple(channels))
+            query = self._feed_query_cache.get(key)
+            if query is None:
+                # Channel ids are digits with a leading dash, safe to inline
+                query = (
+                    " UNION ALL ".join(
+                        select_fmt.format(channel=channel, alias=alias)
+                        for channel, alias in zip(channels, aliases)
+                    )
+                    + suffix
                 )
-
-                cursor.execute(
-                    "SELECT message_id, date, message, views, media_path FROM messages ORDER BY date DESC LIMIT ?",
-                    (limit,),
+                self._feed_query_cache[key] = query
+            return conn.execute(query, params).fetchall()
+
+        rows = []
+        if self._feed_attached:
+            self._detach_feed_dbs()
+        for start in range(0, len(channels), _MAX_ATTACHED_DBS):
+            group = channels[start : start + _MAX_ATTACHED_DBS]
+            try:
+                aliases = [self._attach_feed_db(channel) for channel in group]
+                query = (
+                    " UNION ALL ".join(
+                        select_fmt.format(channel=channel, alias=alias)
+                        for channel, alias in zip(group, aliases)
+                    )
+                    + suffix
                 )
-                rows = cursor.fetchall()
+                rows.extend(conn.execute(query, params).fetchall())
+            finally:
+                self._detach_feed_dbs()
+        return rows
 
-                for row in rows:
-                    all_messages.append(
-                        {
-                            "channel_id": channel,
-                            "channel_name": channel_name,
-                            "message_id": row[0],
-                            "date": row[1],
-                            "message": row[2],
-                            "views": row[3],
-                            "media_path": row[4],
-                        }
-                    )
-            except Exception as e:
-                print(f"[ERROR] Failed to fetch messages for {channel}: {e}")
-                continue
+    def get_recent_messages(self, limit: int = 20) -> List[Dict]:
+        """Fetch recent messages from all channels combined.
+
+        Channel DBs are attached to one connection and queried with a UNION
+        ALL ordered on the indexed date column, so the merge and LIMIT
+        happen inside SQLite instead of K queries plus a Python sort. Past
+        the attach cap the query runs per group of channels and the group
+        winners are merged here.
+        """
+        channels = list(self.state.get("channels", {}))
+        if not channels:
+            return []
+
+        channel_names = self.state.get("channel_names", {})
+
+        try:
+            rows = self._feed_union_rows(
+                channels,
+                "SELECT '{channel}' AS channel_id, message_id, date, message,"
+                " views, media_path FROM {alias}.messages",
+                suffix=" ORDER BY date DESC LIMIT ?",
+                params=(limit,),
+            )
+            if len(channels) > _MAX_ATTACHED_DBS:
+                # Each group contributed its own newest rows; merge them
+                rows.sort(key=lambda row: row[2], reverse=True)
+                del rows[limit:]
+        except Exception as e:
+            print(f"[ERROR] Failed to fetch recent messages: {e}")
+            return []
 
-        # Sort by date descending
-        all_messages.sort(key=lambda x: x["date"], reverse=True)
-        return all_messages[:limit]
+        return [
+            {
+                "channel_id": row[0],
+                "channel_name": channel_names.get(row[0], "Unknown"),
+                "message_id": row[1],
+                "date": row[2],
+                "message": row[3],
+                "views": row[4],
+                "media_path": row[5],
+            }
+            for row in rows
+        ]
 
     def get_export_filename(self, channel: str):
         username = self.state.get("channel_names", {}).get(channel, "no_username")
         return f"{channel}_{username}"
 
+    def _open_export_connection(self, channel: str) -> sqlite3.Connection:
+        """Open a private connection for an export worker thread.
+
+        Exports run on asyncio.to_thread workers; sharing the pooled
+        connections across threads isn't safe, and a short-lived reader
+        is cheap next to the export itself.
+        """
+        db_file = Path("channels") / channel / f"{channel}.db"
+        return sqlite3.connect(str(db_file))
+
     def export_to_csv(self, channel: str):
-        conn = self.get_db_connection(channel)
+        conn = self._open_export_connection(channel)
         filename = self.get_export_filename(channel)
         csv_file = Path("channels") / channel / f"{filename}.csv"
 
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM messages ORDER BY date")
-        columns = [description[0] for description in cursor.description]
-
-        with open(csv_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(columns)
-
-            while True:
-                rows = cursor.fetchmany(1000)
-                if not rows:
-                    break
-                writer.writerows(rows)
+        try:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            cursor.execute(EXPORT_QUERY)
+
+            with open(csv_file, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_COLUMNS)
+                # The cursor iterates in arraysize steps; no intermediate list
+                writer.writerows(cursor)
+        finally:
+            conn.close()
 
     def export_to_json(self, channel: str):
-        conn = self.get_db_connection(channel)
+        conn = self._open_export_connection(channel)
         filename = self.get_export_filename(channel)
         json_file = Path("channels") / channel / f"{filename}.json"
 
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM messages ORDER BY date")
-        columns = [description[0] for description in cursor.description]
-
-        with open(json_file, "w", encoding="utf-8") as f:
-            f.write("[\n")
-            first_row = True
+        cursor.arraysize = 1000
+        cursor.execute(EXPORT_QUERY)
 
+        if orjson is not None:
+            dumps = orjson.dumps
+        else:
+            def dumps(obj):
+                return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+        # Encode a fetchmany chunk at a time and join in bytes: one write
+        # per 1000 rows instead of a pretty-printed json.dump per row
+        with open(json_file, "wb") as f:
+            f.write(b"[\n")
+            first_chunk = True
             while True:
                 rows = cursor.fetchmany(1000)
                 if not rows:
                     break
+                if not first_chunk:
+                    f.write(b",\n")
+                first_chunk = False
+                f.write(
+                    b",\n".join(
+                        dumps(dict(zip(EXPORT_COLUMNS, row))) for row in rows
+                    )
+                )
+            f.write(b"\n]")
 
-                for row in rows:
-                    if not first_row:
-                        f.write(",\n")
-                    else:
-                        first_row = False
-
-                    data = dict(zip(columns, row))
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+        conn.close()
 
-            f.write("\n]")
+    def _export_one(self, channel: str):
+        """Runs on a worker thread: export one channel's CSV and JSON."""
+        self.export_to_csv(channel)
+        self.export_to_json(channel)
 
     async def export_data(self):
         if not self.state["channels"]:
             print("No channels to export")
             return
 
-        for channel in self.state["channels"]:
-            print(f"Exporting data for channel {channel}...")
-            try:
-                self.export_to_csv(channel)
-                self.export_to_json(channel)
-                print(f"[INFO] Completed export for channel {channel}")
-            except Exception as e:
-                print(f"[ERROR] Export failed for channel {channel}: {e}")
+        # Exports are serialization + file I/O, so channels overlap well on
+        # worker threads; cap concurrency to keep the disk from thrashing
+        semaphore = asyncio.Semaphore(4)
+
+        async def _export(channel):
+            async with semaphore:
+                print(f"Exporting data for channel {channel}...")
+                try:
+                    await asyncio.to_thread(self._export_one, channel)
+                    print(f"[INFO] Completed export for channel {channel}")
+                except Exception as e:
+                    print(f"[ERROR] Export failed for channel {channel}: {e}")
+
+        await asyncio.gather(
+            *(_export(channel) for channel in self.state["channels"])
+        )
 
     async def view_channels(self):
         if not self.state["channels"]:
             print("No channels saved")
             return
 
-        print("\nCurrent channels:")
-        for i, (channel, last_id) in enumerate(self.state["channels"].items(), 1):
-            try:
-                conn = self.get_db_connection(channel)
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM messages")
-                count = cursor.fetchone()[0]
-                channel_name = self.state.get("channel_names", {}).get(
-                    channel, "Unknown"
+        # The rendered listing only changes when a channel is added/removed
+        # or its offset moves, and the offsets are part of the key — so a
+        # repeat view inside one menu session skips the COUNT queries too
+        cache_key = tuple(sorted(self.state["channels"].items()))
+        cached_key, rendered = self._view_cache
+        if cache_key == cached_key:
+            print(rendered)
+            return
+
+        # One UNION ALL statement per attach group returns every count in a
+        # round-trip or two instead of K serial COUNT queries
+        counts = {}
+        try:
+            counts = dict(
+                self._feed_union_rows(
+                    list(self.state["channels"]),
+                    "SELECT '{channel}', COUNT(*) FROM {alias}.messages",
                 )
-                print(
+            )
+        except Exception as e:
+            logger.warning(f"Failed to fetch channel message counts: {e}")
+
+        channel_names = self.state.get("channel_names", {})
+        lines = ["\nCurrent channels:"]
+        for i, (channel, last_id) in enumerate(self.state["channels"].items(), 1):
+            channel_name = channel_names.get(channel, "Unknown")
+            count = counts.get(channel)
+            if count is not None:
+                lines.append(
                     f"[{i}] {channel_name} (ID: {channel}), Last Message ID: {last_id}, Messages: {count}"
                 )
-            except:
-                channel_name = self.state.get("channel_names", {}).get(
-                    channel, "Unknown"
-                )
-                print(
+            else:
+                lines.append(
                     f"[{i}] {channel_name} (ID: {channel}), Last Message ID: {last_id}"
                 )
+        rendered = "\n".join(lines)
+        self._view_cache = (cache_key, rendered)
+        print(rendered)
 
     async def list_channels(self):
         try:
-            print("\nList of channels and groups joined by account:")
-            count = 1
-            channels_data = []
-            async for dialog in self.client.iter_dialogs():
-                entity = dialog.entity
-                if dialog.id != 777000 and (
-                    isinstance(entity, Channel) or isinstance(entity, Chat)
-                ):
-                    channel_type = (
-                        "Channel"
-                        if isinstance(entity, Channel) and entity.broadcast
-                        else "Group"
-                    )
-                    username = getattr(entity, "username", None) or "no_username"
-                    print(
-                        f"[{count}] {dialog.title} (ID: {dialog.id}, Type: {channel_type}, Username: @{username})"
-                    )
-                    channels_data.append(
-                        {
-                            "number": count,
-                            "channel_name": dialog.title,
-                            "channel_id": str(dialog.id),
-                            "username": username,
-                            "type": channel_type,
-                        }
-                    )
-                    count += 1
+            cached_at, cached = self._dialogs_cache
+            if (
+                cached is not None
+                and time.monotonic() - cached_at < self.dialogs_cache_ttl
+            ):
+                channels_data = cached
+            else:
+                count = 1
+                channels_data = []
+                # Collect silently while iterating dialogs: a print+flush per
+                # dialog would interleave stdout syscalls with the network RTTs
+                # of iter_dialogs
+                async for dialog in self.client.iter_dialogs():
+                    entity = dialog.entity
+                    if dialog.id != 777000 and (
+                        isinstance(entity, Channel) or isinstance(entity, Chat)
+                    ):
+                        channel_type = (
+                            "Channel"
+                            if isinstance(entity, Channel) and entity.broadcast
+                            else "Group"
+                        )
+                        username = getattr(entity, "username", None) or "no_username"
+                        channels_data.append(
+                            {
+                                "number": count,
+                                "channel_name": dialog.title,
+                                "channel_id": str(dialog.id),
+                                "username": username,
+                                "type": channel_type,
+                            }
+                        )
+                        count += 1
+                self._dialogs_cache = (time.monotonic(), channels_data)
+
+            print(
+                "\nList of channels and groups joined by account:\n"
+                + "\n".join(
+                    f"[{c['number']}] {c['channel_name']} (ID: {c['channel_id']},"
+                    f" Type: {c['type']}, Username: @{c['username']})"
+                    for c in channels_data
+                )
+            )
 
             if channels_data:
                 csv_file = Path("channels_list.csv")
-                with open(csv_file, "w", newline="", encoding="utf-8") as f:
+                with open(
+                    csv_file, "w", newline="", encoding="utf-8", buffering=1 << 20
+                ) as f:
                     writer = csv.DictWriter(
                         f,
                         fieldnames=[
@@ -1283,81 +2000,60 @@ class OptimizedTelegramScraper:
         else:
             print("[INFO] Already authenticated!")
 
+        await self._configure_download_limits()
         return True
 
     def parse_channel_selection(self, choice):
-        channels_list = list(self.state["channels"].keys())
-        selected_channels = []
-
-        if choice.lower() == "all":
-            return channels_list
-
-        for selection in [x.strip() for x in choice.split(",")]:
-            try:
-                if selection.startswith("-"):
-                    if selection in self.state["channels"]:
-                        selected_channels.append(selection)
-                    else:
-                        print(f"Channel ID {selection} not found in your channels")
-                else:
-                    num = int(selection)
-                    if 1 <= num <= len(channels_list):
-                        selected_channels.append(channels_list[num - 1])
-                    else:
-                        print(
-                            f"Invalid channel number: {num}. Valid range: 1-{len(channels_list)}"
-                        )
-            except ValueError:
-                print(
-                    f"Invalid input: {selection}. Use numbers (1,2,3) or full IDs (-100123...)"
-                )
-
-        return selected_channels
+        selected, errors = _parse_channel_selection(
+            choice.strip(), tuple(self.state["channels"])
+        )
+        for error in errors:
+            print(error)
+        return list(selected)
+
+    @staticmethod
+    def normalize_channel_id(entity_id) -> str:
+        """Map a Telethon entity id to the -100-prefixed state/DB key."""
+        channel_id = str(entity_id)
+        return (
+            channel_id if channel_id.startswith("-100") else f"-100{channel_id}"
+        )
 
-    async def scrape_channel_by_url(self, url: str, target_lang: str = None):
+    async def scrape_channel_by_url(
+        self, url: str, target_lang: str = None, limit: int = None
+    ):
         """API Helper: Join/Find channel by URL and scrape it"""
         try:
             # Join/Get entity
             entity = await self.client.get_entity(url)
-            channel_id = str(entity.id)
-            # Add to state if not exists (so we track offsets)
-            if channel_id not in self.state["channels"]:
-                # For channels we usually need -100 prefix for DB but telethon gives ID
-                # If it's a broadcast channel it might be just ID.
-                # Let's handle formatting.
-                full_id = (
-                    f"-100{channel_id}"
-                    if not str(channel_id).startswith("-100")
-                    else str(channel_id)
-                )
 
-                self.state["channels"][full_id] = 0
+            channel_key = self._channel_key_by_entity_id.get(entity.id)
+            if channel_key is None:
+                channel_key = self.normalize_channel_id(entity.id)
+                self._channel_key_by_entity_id[entity.id] = channel_key
+
+            # Add to state if not exists (so we track offsets)
+            if channel_key not in self.state["channels"]:
+                self.state["channels"][channel_key] = 0
                 username = getattr(entity, "username", "") or "unknown"
                 if "channel_names" not in self.state:
                     self.state["channel_names"] = {}
-                self.state["channel_names"][full_id] = username
+                self.state["channel_names"][channel_key] = username
                 self.save_state()
 
-                print(f"Added new channel via API: {username} ({full_id})")
-                channel_to_scrape = full_id
-            else:
-                # Find the existing ID key
-                channel_to_scrape = (
-                    f"-100{channel_id}"
-                    if not str(channel_id).startswith("-100")
-                    else str(channel_id)
-                )
+                print(f"Added new channel via API: {username} ({channel_key})")
 
             # Scrape it
             messages = await self.scrape_channel(
-                channel_to_scrape,
+                channel_key,
                 0,
                 force_rescrape=True,
                 target_lang=target_lang,
+                limit=limit,
             )
             return {
                 "status": "success",
-                "channel_id": channel_to_scrape,
+                "channel_id": channel_key,
                 "messages": messages,
             }
 
@@ -1376,7 +2072,7 @@ class OptimizedTelegramScraper:
         print("• Multiple: 1,3,5 or mix formats")
         print("• All channels: all")
 
-        choice = input("\nEnter selection: ").strip()
+        choice = (await ainput("\nEnter selection: ")).strip()
         selected_channels = self.parse_channel_selection(choice)
 
         if selected_channels:
@@ -1408,11 +2104,13 @@ class OptimizedTelegramScraper:
             print("[Q] Quit")
             print("=" * 40)
 
-            choice = input("Enter your choice: ").lower().strip()
+            choice = (await ainput("Enter your choice: ")).lower().strip()
 
             try:
+                # One lookup per menu cycle; every branch below reads it
+                channels_dict = self.state["channels"]
                 if choice == "r":
-                    if not self.state["channels"]:
+                    if not channels_dict:
                         print("No channels to remove")
                         continue
 
@@ -1420,14 +2118,14 @@ class OptimizedTelegramScraper:
                     print("\nTo remove channels:")
                     print("• Single: 1 or -1001234567890")
                     print("• Multiple: 1,2,3 or mix formats")
-                    selection = input("Enter selection: ").strip()
+                    selection = (await ainput("Enter selection: ")).strip()
                     selected_channels = self.parse_channel_selection(selection)
 
                     if selected_channels:
                         removed_count = 0
                         for channel in selected_channels:
-                            if channel in self.state["channels"]:
-                                del self.state["channels"][channel]
+                            if channel in channels_dict:
+                                del channels_dict[channel]
                                 print(f"[INFO] Removed channel {channel}")
                                 removed_count += 1
                             else:
@@ -1456,7 +2154,7 @@ class OptimizedTelegramScraper:
                     print("\nMessage Limit Configuration")
                     print("Set how many newest messages to save per channel")
                     print("Enter a number (e.g., 5, 10, 50) or 'all' for unlimited")
-                    limit_input = input("Enter limit: ").strip().lower()
+                    limit_input = (await ainput("Enter limit: ")).strip().lower()
 
                     if limit_input == "all":
                         self.state["message_limit"] = None
@@ -1477,7 +2175,7 @@ class OptimizedTelegramScraper:
                             print("[ERROR] Invalid input. Enter a number or 'all'")
 
                 elif choice == "z":
-                    if not self.state["channels"]:
+                    if not channels_dict:
                         print("No channels available. Use [L] to add channels first")
                         continue
 
@@ -1487,7 +2185,7 @@ class OptimizedTelegramScraper:
                     print("• Multiple: 1,3,5 or mix formats")
                     print("• All channels: all")
 
-                    choice_input = input("\nEnter selection: ").strip()
+                    choice_input = (await ainput("\nEnter selection: ")).strip()
                     selected_channels = self.parse_channel_selection(choice_input)
 
                     if selected_channels:
@@ -1509,7 +2207,12 @@ class OptimizedTelegramScraper:
                     task = asyncio.create_task(self.continuous_scraping())
                     print("Continuous scraping started. Press Ctrl+C to stop.")
                     try:
-                        await asyncio.sleep(float("inf"))
+                        # Await the task directly instead of parking on an
+                        # infinite sleep timer; completion or cancellation
+                        # wakes us without an extra timer handle
+                        await task
+                    except asyncio.CancelledError:
+                        pass
                     except KeyboardInterrupt:
                         self.continuous_scraping_active = False
                         task.cancel()
@@ -1533,68 +2236,80 @@ class OptimizedTelegramScraper:
                     print("• Multiple: 1,3,5 or mix formats")
                     print("• All channels: all")
                     print("• Press Enter to skip adding")
-                    selection = input("\nEnter selection (or Enter to skip): ").strip()
+                    selection = (
+                        await ainput("\nEnter selection (or Enter to skip): ")
+                    ).strip()
 
                     if selection:
                         added_count = 0
                         added_channels = []
+                        # Index once so id-based selections are hash probes
+                        # rather than a scan of channels_data per token
+                        by_id = {c["channel_id"]: c for c in channels_data}
+                        # Local alias: skips the attribute + key resolution
+                        # on every iteration of the add loops
+                        channels = channels_dict
+                        channel_names = self.state.setdefault("channel_names", {})
 
                         if selection.lower() == "all":
+                            # Collect the per-channel lines and emit them in
+                            # one write; a print per channel means a flush
+                            # syscall each when adding hundreds at once
+                            out = []
                             for channel_info in channels_data:
                                 channel_id = channel_info["channel_id"]
-                                if channel_id not in self.state["channels"]:
-                                    self.state["channels"][channel_id] = 0
-                                    if "channel_names" not in self.state:
-                                        self.state["channel_names"] = {}
-                                    self.state["channel_names"][channel_id] = (
-                                        channel_info["username"]
-                                    )
-                                    print(
-                                        f"✅ Added channel {channel_info['channel_name']} (ID: {channel_id})"
+                                if channels.get(channel_id, _MISSING) is _MISSING:
+                                    channels[channel_id] = 0
+                                    channel_names[channel_id] = channel_info[
+                                        "username"
+                                    ]
+                                    out.append(
+                                        _ADD_LINE(
+                                            channel_info["channel_name"], channel_id
+                                        )
                                     )
                                     added_count += 1
                                 else:
-                                    print(
-                                        f"Channel {channel_info['channel_name']} already added"
+                                    out.append(
+                                        _DUP_LINE(channel_info["channel_name"])
                                     )
+                            if out:
+                                sys.stdout.write("\n".join(out) + "\n")
+                                sys.stdout.flush()
                         else:
-                            for sel in [x.strip() for x in selection.split(",")]:
+                            for sel in map(str.strip, selection.split(",")):
                                 try:
-                                    if sel.startswith("-"):
+                                    # One int() handles both forms: list
+                                    # positions are small positives, raw
+                                    # channel IDs parse negative
+                                    num = int(sel)
+                                    if num < 0:
                                         channel_id = sel
-                                        channel_info = next(
-                                            (
-                                                c
-                                                for c in channels_data
-                                                if c["channel_id"] == channel_id
-                                            ),
-                                            None,
-                                        )
+                                        channel_info = by_id.get(channel_id)
                                         if not channel_info:
                                             print(f"Channel ID {channel_id} not found")
                                             continue
+                                    elif 1 <= num <= len(channels_data):
+                                        channel_info = channels_data[num - 1]
+                                        channel_id = channel_info["channel_id"]
                                     else:
-                                        num = int(sel)
-                                        if 1 <= num <= len(channels_data):
-                                            channel_info = channels_data[num - 1]
-                                            channel_id = channel_info["channel_id"]
-                                        else:
-                                            print(
-                                                f"Invalid number: {num}. Choose 1-{len(channels_data)}"
-                                            )
-                                            continue
+                                        print(
+                                            f"Invalid number: {num}. Choose 1-{len(channels_data)}"
+                                        )
+                                        continue
 
-                                    if channel_id in self.state["channels"]:
+                                    if (
+                                        channels.get(channel_id, _MISSING)
+                                        is not _MISSING
+                                    ):
                                         print(
                                             f"Channel {channel_info['channel_name']} already added"
                                         )
                                     else:
-                                        self.state["channels"][channel_id] = 0
-                                        if "channel_names" not in self.state:
-                                            self.state["channel_names"] = {}
-                                        self.state["channel_names"][channel_id] = (
-                                            channel_info["username"]
-                                        )
+                                        channels[channel_id] = 0
+                                        channel_names[channel_id] = channel_info[
+                                            "username"
+                                        ]
                                         print(
                                             f"[INFO] Added channel {channel_info['channel_name']} (ID: {channel_id})"
                                         )
@@ -1614,28 +2329,43 @@ class OptimizedTelegramScraper:
                             limit_info = f" (limit: {limit_display})"
 
                             scrape_now = (
-                                input(
+                                await ainput(
                                     f"\nScrape {added_count} new channel(s) immediately?{limit_info} [Y/n]: "
                                 )
-                                .lower()
-                                .strip()
-                            )
+                            ).lower().strip()
 
                             if scrape_now in ["", "y", "yes"]:
                                 print(f"\nStarting immediate scrape of new channels...")
-                                for i, channel_id in enumerate(added_channels, 1):
-                                    print(
-                                        f"\n[{i}/{len(added_channels)}] Initializing scrape for: {channel_id}"
-                                    )
-                                    await self.scrape_channel(
-                                        channel_id, 0, force_rescrape=True
+                                # New channels are independent and I/O-bound,
+                                # so scrape them concurrently with a small cap
+                                # on simultaneous Telegram work
+                                scrape_sem = asyncio.Semaphore(
+                                    self.state.get("scrape_concurrency", 4)
+                                )
+
+                                async def _scrape_new(i, channel_id):
+                                    async with scrape_sem:
+                                        print(
+                                            f"\n[{i}/{len(added_channels)}] Initializing scrape for: {channel_id}"
+                                        )
+                                        await self.scrape_channel(
+                                            channel_id, 0, force_rescrape=True
+                                        )
+
+                                await asyncio.gather(
+                                    *(
+                                        _scrape_new(i, channel_id)
+                                        for i, channel_id in enumerate(
+                                            added_channels, 1
+                                        )
                                     )
+                                )
                                 print(f"\n[INFO] Completed immediate scraping!")
                         else:
                             print("No new channels were added")
 
                 elif choice == "t":
-                    if not self.state["channels"]:
+                    if not channels_dict:
                         print("No channels available. Add channels first")
                         continue
 
@@ -1643,20 +2373,29 @@ class OptimizedTelegramScraper:
                     print(
                         "\nEnter channel NUMBER (1,2,3...) or full channel ID (-100123...)"
                     )
-                    selection = input("Enter your selection: ").strip()
+                    selection = (await ainput("Enter your selection: ")).strip()
                     selected_channels = self.parse_channel_selection(selection)
 
-                    if len(selected_channels) == 1:
-                        channel = selected_channels[0]
-                        print(f"Rescaping media for channel: {channel}")
-                        await self.rescrape_media(channel)
-                    elif len(selected_channels) > 1:
-                        print("Please select only one channel for media rescaping")
+                    if selected_channels:
+                        print(
+                            f"Rescaping media for {len(selected_channels)} channel(s)..."
+                        )
+                        # Maintenance is Telegram-bound, so channels overlap;
+                        # three at a time keeps the session responsive
+                        maint_sem = asyncio.Semaphore(3)
+
+                        async def _rescrape(channel):
+                            async with maint_sem:
+                                await self.rescrape_media(channel)
+
+                        await asyncio.gather(
+                            *(_rescrape(c) for c in selected_channels)
+                        )
                     else:
                         print("No valid channel selected")
 
                 elif choice == "f":
-                    if not self.state["channels"]:
+                    if not channels_dict:
                         print("No channels available. Add channels first")
                         continue
 
@@ -1664,14 +2403,17 @@ class OptimizedTelegramScraper:
                     print(
                         "\nEnter channel NUMBER (1,2,3...) or full channel ID (-100123...)"
                     )
-                    selection = input("Enter your selection: ").strip()
+                    selection = (await ainput("Enter your selection: ")).strip()
                     selected_channels = self.parse_channel_selection(selection)
 
-                    if len(selected_channels) == 1:
-                        channel = selected_channels[0]
-                        await self.fix_missing_media(channel)
-                    elif len(selected_channels) > 1:
-                        print("Please select only one channel for fixing missing media")
+                    if selected_channels:
+                        maint_sem = asyncio.Semaphore(3)
+
+                        async def _fix(channel):
+                            async with maint_sem:
+                                await self.fix_missing_media(channel)
+
+                        await asyncio.gather(*(_fix(c) for c in selected_channels))
                     else:
                         print("No valid channel selected")
 
@@ -1690,6 +2432,7 @@ class OptimizedTelegramScraper:
 
     async def run(self):
         display_ascii_art()
+        _setup_input_history()
         if await self.initialize_client():
             try:
                 await self.manage_channels()